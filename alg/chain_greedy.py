@@ -11,9 +11,10 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import itertools
 import math
 
-from alg.util import ipowerset, recreate_chain_blocks, block_memory, block_cost, block_latency, block_cpu
+from alg.util import block_memory, block_cost, block_latency, block_cpu
 
 
 def ichain_blocks(memory: list[int], M: int, rate: list[int], N: int) -> list[list[list[int]]]:
@@ -22,13 +23,18 @@ def ichain_blocks(memory: list[int], M: int, rate: list[int], N: int) -> list[li
     The calculation is improved compared to brute force to only start calculating cuts from c_min.
     """
     n = len(memory)
-    for cut in ipowerset(range(1, n), start=math.ceil(sum(memory) / M) - 1):
-        barr = sorted({0}.union(cut))
-        # Consider only block with appropriate size
-        valid = [blk for blk in recreate_chain_blocks(barr, n)
-                 if block_memory(memory, blk[0], blk[-1]) <= M and block_cpu(rate, blk[0], blk[-1]) <= N]
-        if len(valid) == len(barr):
-            yield valid
+    # Iterate over the subsets of cuts in increasing size
+    for c in range(max(math.ceil(sum(memory) / M) - 1, 0), n):
+        for cut in itertools.combinations(range(1, n), c):
+            partition = []
+            # Cuts are generated in ascending order -> blocks [b, w-1] can be created without sorting
+            for b, w in itertools.pairwise((0, *cut, n)):
+                # Consider only block with appropriate size and drop partition at the first invalid block
+                if block_memory(memory, b, w - 1) > M or block_cpu(rate, b, w - 1) > N:
+                    break
+                partition.append(list(range(b, w)))
+            else:
+                yield partition
 
 
 def greedy_chain_partitioning(runtime: list, memory: list, rate: list, M: int = math.inf, N: int = math.inf,
@@ -51,10 +57,16 @@ def greedy_chain_partitioning(runtime: list, memory: list, rate: list, M: int =
     """
     best_res, best_cost = [([], math.inf, None)], math.inf
     for partition in ichain_blocks(memory, M, rate, N):
-        if (sum_lat := sum(block_latency(runtime, blk[0], blk[-1], delay, start, end) for blk in partition)) > L:
-            continue
-        elif (sum_cost := sum(block_cost(runtime, rate, blk[0], blk[-1], unit) for blk in partition)) == best_cost:
-            best_res.append((partition, sum_cost, sum_lat))
-        elif sum_cost < best_cost:
-            best_res, best_cost = [(partition, sum_cost, sum_lat)], sum_cost
+        sum_lat, sum_cost = 0, 0
+        for blk in partition:
+            sum_lat += block_latency(runtime, blk[0], blk[-1], delay, start, end)
+            sum_cost += block_cost(runtime, rate, blk[0], blk[-1], unit)
+            # Drop partition as soon as it violates L or its partial cost exceeds the best cost
+            if sum_lat > L or sum_cost > best_cost:
+                break
+        else:
+            if sum_cost == best_cost:
+                best_res.append((partition, sum_cost, sum_lat))
+            else:
+                best_res, best_cost = [(partition, sum_cost, sum_lat)], sum_cost
     return best_res
@@ -11,20 +11,8 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-import functools
 import itertools
 import math
-import typing
-
-
-class State(typing.NamedTuple):
-    """Store block attributes for a given subcase"""
-    barr: int = None  # Barrier/heading node of the last block in the given subcase partitioning
-    cost: int = math.inf  # Sum cost of the partitioning
-    lat: int = math.inf  # Sum latency of the partitioning regarding the limited subchain[start, end]
-
-    def __repr__(self):
-        return repr(tuple(self))
 
 
 def chain_partitioning(runtime: list, memory: list, rate: list, M: int = math.inf, N: int = math.inf,
@@ -45,87 +33,122 @@ def chain_partitioning(runtime: list, memory: list, rate: list, M: int = math.in
     :param start:   head node of the latency-limited subchain
     :param end:     tail node of the latency-limited subchain
     :param unit:    rounding unit for the cost calculation (default: 100 ms)
-    :param ret_dp:  return the calculated DP matrix instead of the barrier nodes
+    :param ret_dp:  return the calculated DP matrix instead of the barrier nodes (without subcase latencies if L is inf)
     :return:        tuple of barrier nodes, sum cost of the partitioning, and the calculated latency on the subchain
     """
     n = len(runtime)
     end = end if end is not None else n - 1
+    # Prefix sums of memory and runtime values to calculate the block sums in O(1)
+    mem_ps, rt_ps = [0, *itertools.accumulate(memory)], [0, *itertools.accumulate(runtime)]
 
-    @functools.lru_cache(maxsize=n - 1)
     def block_memory(_b: int, _w: int) -> int:
         """Calculate memory of block[b, w]"""
-        return sum(memory[_b: _w + 1])
+        return mem_ps[_w + 1] - mem_ps[_b]
+
+    # Left triangular table of the CPU needs of blocks[b, w] calculated from the running max of rates -> cpu[w][b]
+    cpu = []
+    for _w in range(n):
+        cpu.append(row := [1] * (_w + 1))
+        r_max, r_cpu = 0, 1
+        for _b in reversed(range(_w + 1)):
+            r_max = max(r_max, rate[_b])
+            row[_b] = r_cpu = max(r_cpu, -(-r_max // rate[_b]))
 
-    @functools.lru_cache(maxsize=n - 1)
     def block_cpu(_b: int, _w: int) -> int:
-        """Calculate memory of block[b, w]"""
-        r_max = itertools.chain((1,), enumerate(itertools.accumulate(reversed(rate[_b: _w + 1]), max)))
-        return functools.reduce(lambda pre, max_i: max(pre, math.ceil(max_i[1] / rate[_w - max_i[0]])), r_max)
+        """Calculate CPU core need of block[b, w]"""
+        return cpu[_w][_b]
 
-    @functools.lru_cache(maxsize=n - 1)
     def block_cost(_b: int, _w: int) -> int:
         """Calculate running time of block[b, w]"""
-        return rate[_b] * (math.ceil(sum(runtime[_b: _w + 1]) / unit) * unit)
+        # Round up to the next unit using floor division: ceil(x / u) = -(-x // u)
+        return rate[_b] * (-((rt_ps[_b] - rt_ps[_w + 1]) // unit) * unit)
 
-    @functools.lru_cache(maxsize=n - 1)
     def block_latency(_b: int, _w: int) -> int:
         """Calculate relevant latency for block[b, w]"""
-        # Do not consider latency if no intersection
-        if end < _b or _w < start:
-            return 0
-        blk_lat = sum(runtime[max(_b, start): min(_w, end) + 1])
-        # Ignore delay if latency path starts within the subchain
-        return delay + blk_lat if start < _b else blk_lat
+        # Intersection of block[b, w] and subchain[start, end]
+        lo, hi = max(_b, start), min(_w, end)
+        # Do not consider latency if no intersection and ignore delay if latency path starts within the subchain
+        return (lo <= hi) * (rt_ps[hi + 1] - rt_ps[lo] + (start < _b) * delay)
 
     # Check lower bound for latency limit
-    if L < (lat_min := sum(runtime[start: end + 1])):
+    if L < (lat_min := rt_ps[end + 1] - rt_ps[start]):
         return None, None, lat_min
     # Check if memory constraint allows feasible solutions for the given latency constraint
-    k_min = max(math.ceil(sum(memory[start: end + 1]) / M),
-                sum(1 for i, j in itertools.pairwise(rate) if math.ceil(j / i) > N))
-    k_max = math.floor(min((L - sum(runtime[start: end + 1])) / delay + 1, n))
+    k_min = max(math.ceil((mem_ps[end + 1] - mem_ps[start]) / M), sum(cpu[_w][_w - 1] > N for _w in range(1, n)))
+    k_max = math.floor(min((L - lat_min) / delay + 1, n))
     if k_max < k_min:
         return None, None, None
     # Check single node partitioning
     if len(runtime) == 1:
         return [0], block_cost(0, 0), block_latency(0, 0)
-    # Initialize left triangular part of DP matrix -> DP[i][j][COST, LAT, BARR]
-    DP = [[State() for _ in range(i + 1)] for i in range(n)]
+    # Initialize left triangular part of DP matrix as separate tables of block attributes -> DP_*[i][j]
+    # DP_barr: barrier/heading node of the last block in the given subcase partitioning
+    # DP_cost: sum cost of the partitioning
+    # DP_lat:  sum latency of the partitioning regarding the limited subchain[start, end]
+    DP_barr = [[None] * (i + 1) for i in range(n)]
+    DP_cost = [[math.inf] * (i + 1) for i in range(n)]
+    DP_lat = [[math.inf] * (i + 1) for i in range(n)]
     # Initialize default values for grouping first w nodes into one group
     for w in range(0, n):
         if block_memory(0, w) > M or block_cpu(0, w) > N:
             break
-        DP[w][0] = State(0, block_cost(0, w), block_latency(0, w))
+        DP_barr[w][0], DP_cost[w][0], DP_lat[w][0] = 0, block_cost(0, w), block_latency(0, w)
     # Calculate Dynamic Programming matrix
     for w in range(1, n):
-        for k in range(1, w + 1):
-            for b in reversed(range(k, w + 1)):
-                # As k decreases, bigger blocks [k, w] will continue violating the memory constraint
-                if block_memory(b, w) > M or block_cpu(b, w) > N:
-                    break
-                if (lat := DP[b - 1][k - 1].lat + block_latency(b, w)) <= L:
-                    # Store and overwrite subcases with equal costs (<=) to consider larger blocks for lower latency
-                    if (cost := DP[b - 1][k - 1].cost + block_cost(b, w)) <= DP[w][k].cost:
-                        DP[w][k] = State(b, cost, lat)
+        # Attributes of the feasible blocks [b, w] are independent of k -> precalculate them once for all k
+        blocks = []
+        for b in reversed(range(1, w + 1)):
+            # As b decreases, bigger blocks [b, w] will continue violating the memory constraint
+            if block_memory(b, w) > M or block_cpu(b, w) > N:
+                break
+            blocks.append((b, block_cost(b, w), block_latency(b, w) if L < math.inf else 0))
+        # At most k_max blocks can intersect the subchain[start, end] -> the remaining ones must be outside of it
+        for k in range(1, min(w, k_max - 1 + start + max(w - end, 0)) + 1):
+            if L < math.inf:
+                for b, blk_cost, blk_lat in blocks:
+                    # Block [b, w] must leave at least k nodes for the preceding k blocks
+                    if b < k:
+                        break
+                    if (lat := DP_lat[b - 1][k - 1] + blk_lat) <= L:
+                        # Store and overwrite subcases with equal costs (<=) to consider larger blocks for lower latency
+                        if (cost := DP_cost[b - 1][k - 1] + blk_cost) <= DP_cost[w][k]:
+                            DP_barr[w][k], DP_cost[w][k], DP_lat[w][k] = b, cost, lat
+            else:
+                # Without latency limit, the latency of subcases is not tracked
+                for b, blk_cost, _ in blocks:
+                    if b < k:
+                        break
+                    if (cost := DP_cost[b - 1][k - 1] + blk_cost) <= DP_cost[w][k]:
+                        DP_barr[w][k], DP_cost[w][k] = b, cost
             # If first w node cannot be partitioned into k blocks due to L then it cannot be partitioned into k+1
-            if DP[w][k - 1].lat < DP[w][k].lat == math.inf:
+            if DP_cost[w][k - 1] < DP_cost[w][k] == math.inf:
                 break
+        # If first w nodes cannot be partitioned then neither can the longer subchains
+        if min(DP_cost[w]) == math.inf:
+            break
     # Index of optimal cost partition, the fist one if multiple min values exist
-    k_opt = min(range(n), key=lambda x: DP[-1][x].cost)
-    _, opt_cost, opt_lat = DP[-1][k_opt]
+    k_opt = min(range(n), key=DP_cost[-1].__getitem__)
+    opt_cost, opt_lat = DP_cost[-1][k_opt], DP_lat[-1][k_opt]
     if opt_cost < math.inf:
-        return DP if ret_dp else extract_barr(DP, k_opt), opt_cost, opt_lat
+        barr = extract_barr(DP_barr, k_opt)
+        if L == math.inf:
+            # Calculate latency of the optimal partitioning only
+            opt_lat = sum(block_latency(b, w - 1) for b, w in itertools.pairwise((*barr, n)))
+        if ret_dp:
+            # Assemble DP matrix with the attribute tuples of the subcases -> DP[i][j][BARR, COST, LAT]
+            return [list(zip(*row)) for row in zip(DP_barr, DP_cost, DP_lat)], opt_cost, opt_lat
+        return barr, opt_cost, opt_lat
     else:
         return None, math.inf, None
 
 
-def extract_barr(DP: list[list[State]], k: int) -> list[int]:
-    """Extract barrier nodes form DP matrix by iteratively backtracking the minimal cost subcases from *k*"""
+def extract_barr(DP_barr: list[list[int]], k: int) -> list[int]:
+    """Extract barrier nodes form DP barrier table by iteratively backtracking the minimal cost subcases from *k*"""
     barr = []
-    w = len(DP) - 1
+    w = len(DP_barr) - 1
     for k in reversed(range(0, k + 1)):
         # The cached b value marks the barrier node of the k. block and refers the subcase => C[b-1,k-1] + c[b,w]
-        b = DP[w][k].barr
+        b = DP_barr[w][k]
         w = b - 1
         barr.append(b)
     barr.reverse()
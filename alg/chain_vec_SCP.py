@@ -11,12 +11,11 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-import itertools
 import math
 
 import numpy as np
 
-from alg.util import MEM, CPU, COST, LAT, BARR
+from alg.util import COST, LAT, BARR
 
 
 def vec_chain_partitioning(runtime: list, memory: list, rate: list, M: int = np.inf, N: int = np.inf, L: int = np.inf,
@@ -43,76 +42,72 @@ def vec_chain_partitioning(runtime: list, memory: list, rate: list, M: int = np.
     n = len(runtime)
     end = end if end is not None else n - 1
 
-    def block_memory(_v: int, cumsum: list = (0, 0, 0), from_left=False) -> int:
-        """Calculate memory of a block from the cumulative sum of block[v+1, w] or block[b, v-1]"""
-        cumsum[MEM] += memory[_v]
-        return cumsum[MEM]
+    # Prefix sums of memory and runtime values to calculate the attributes of blocks [b, w] for all b at once
+    mem_ps, rt_ps = np.concatenate(((0,), np.cumsum(memory))), np.concatenate(((0,), np.cumsum(runtime)))
+    rate_arr = np.asarray(rate)
 
-    def block_cpu(_v: int, cumsum: list = (0, 0, 0, (0, 1)), from_left=False) -> int:
-        """Calculate CPU need of a block from the cached cumulative sum of block[v+1, w]"""
-        cumsum[CPU][0] = max(cumsum[CPU][0], rate[_v])
-        if from_left:
-            return cumsum[CPU][0]
-        cumsum[CPU][1] = max(cumsum[CPU][1], math.ceil(cumsum[CPU][0] / rate[_v]))
-        return cumsum[CPU][1]
+    def block_memory(_b: int | np.ndarray, _w: int) -> int | np.ndarray:
+        """Calculate memory of block[b, w]"""
+        return mem_ps[_w + 1] - mem_ps[_b]
 
-    def block_cost(_v: int, cumsum: list = (0, 0, 0), from_left: bool = False) -> int:
-        """Calculate running time of block[b, w] from the cumulative sum of block[v+1, w] or block[0, v-1]"""
-        cumsum[COST] += runtime[_v]
-        return rate[0 if from_left else _v] * (math.ceil(cumsum[COST] / unit) * unit)
+    def block_cpu(_w: int) -> np.ndarray:
+        """Calculate CPU need of blocks [b, w] for all b in [0, w] from the cumulative max of rates in reversed order"""
+        r = rate_arr[_w::-1]
+        return np.maximum.accumulate(-(-np.maximum.accumulate(r) // r))[::-1]
 
-    def block_latency(_b: int, _w: int, cumsum: list = (0, 0, 0), from_left: bool = False) -> int:
-        """Calculate relevant latency for block[b, w] from the cumulative sum of block[b+1, w] or block[0, w-1]"""
-        # Do not consider latency if no intersection
-        if end < _b or _w < start:
-            return 0
-        if from_left:
-            # No need to add next node if it is outside of intersection
-            if end < _w:
-                return cumsum[LAT]
-            cumsum[LAT] += runtime[_w]
-        else:
-            # No need to add next node if it is outside of intersection
-            if b < start:
-                return cumsum[LAT]
-            cumsum[LAT] += runtime[_b]
-        # Ignore delay if latency path starts within the subchain
-        return delay + cumsum[LAT] if start < _b else cumsum[LAT]
+    def block_cost(_b: int | np.ndarray, _w: int) -> int | np.ndarray:
+        """Calculate running time of block[b, w]"""
+        return rate_arr[_b] * (-((rt_ps[_b] - rt_ps[_w + 1]) // unit) * unit)
+
+    def block_latency(_b: int | np.ndarray, _w: int) -> int | np.ndarray:
+        """Calculate relevant latency for block[b, w]"""
+        # Consider latency only for intersecting blocks and ignore delay if latency path starts within the subchain
+        lo, hi = np.maximum(_b, start), min(_w, end)
+        return (lo <= hi) * (rt_ps[hi + 1] - rt_ps[lo] + (start < _b) * delay)
 
     # Check lower bound for latency limit
-    if L < (lat_min := sum(runtime[start: end + 1])):
+    if L < (lat_min := rt_ps[end + 1] - rt_ps[start]):
         return None, None, lat_min
     # Check if memory constraint allows feasible solutions for the given latency constraint
-    k_min = max(math.ceil(sum(memory[start: end + 1]) / M),
-                sum(1 for i, j in itertools.pairwise(rate) if math.ceil(j / i) > N))
-    k_max = math.floor(min((L - sum(runtime[start: end + 1])) / delay + 1, n))
+    k_min = max(math.ceil((mem_ps[end + 1] - mem_ps[start]) / M),
+                np.count_nonzero(-(-rate_arr[1:] // rate_arr[:-1]) > N))
+    k_max = math.floor(min((L - lat_min) / delay + 1, n))
     if k_max < k_min:
         return None, None, None
     # Check single node partitioning
     if len(runtime) == 1:
-        return [0], block_cost(0), block_latency(0, 0)
+        return [0], block_cost(0, 0), block_latency(0, 0)
     # Initialize DP matrix -> DP[i][j][BARR, COST, LAT]
     DP = np.full((n, n, 3), np.inf)
-    # Define cache for cumulative block attribute calculations: [MEM, COST, LAT]
-    __cache = [0, 0, 0, [0, 0]]
     # Initialize default values for grouping first w nodes into one group
     for w in range(0, n):
-        if block_memory(w, __cache, from_left=True) > M or block_cpu(w, __cache, from_left=True) > N:
+        if block_memory(0, w) > M or block_cpu(w)[0] > N:
             break
-        DP[w, 0] = np.array((0, block_cost(w, __cache, from_left=True), block_latency(0, w, __cache, from_left=True)))
+        DP[w, 0] = 0, block_cost(0, w), block_latency(0, w)
+    # Node/block indices shared by the iterations
+    idx = np.arange(n)
     # Calculate Dynamic Programming matrix
     for w in range(1, n):
-        # Cache for the cumulative sum based calculation of expanding block's memory, runtime and latency values
-        __cache = [0, 0, 0, [0, 0]]
-        for b in reversed(range(1, w + 1)):
-            # As k decreases, bigger blocks [k, w] will continue violating the memory constraint
-            if block_memory(b, __cache) > M or block_cpu(b, __cache) > N:
-                break
-            subcases = DP[b - 1, :b] + np.array((0, block_cost(b, __cache), block_latency(b, w, __cache)))
-            subcases[:, BARR] = b
-            # Store and overwrite subcases with equal costs (<=) to consider larger blocks for lower latency
-            feasible_idx = np.flatnonzero((subcases[:, LAT] <= L) & (subcases[:, COST] <= DP[w, 1:b + 1, COST]))
-            DP[w, feasible_idx + 1] = subcases[feasible_idx]
+        # Barrier node candidates of the last block [b, w]
+        b_arr = idx[1:w + 1]
+        # As b decreases, bigger blocks [b, w] will continue violating the memory constraint
+        violated = np.flatnonzero((block_memory(b_arr, w) > M) | (block_cpu(w)[1:] > N))
+        if len(violated):
+            b_arr = b_arr[violated[-1] + 1:]
+            if not len(b_arr):
+                continue
+        blk_cost, blk_lat = block_cost(b_arr, w), block_latency(b_arr, w)
+        # Subcases of all feasible b -> C[b-1, k-1] + c[b, w] for k = 1..w calculated in place on a copy of DP rows
+        subcases = DP[b_arr[0] - 1:w, :w].copy()
+        subcases[..., BARR] = b_arr[:, None]
+        subcases[..., COST] += blk_cost[:, None]
+        subcases[..., LAT] += blk_lat[:, None]
+        subcases[subcases[..., LAT] > L, COST] = np.inf
+        # Choose min cost subcases, the first one with the largest block if multiple min values exist
+        subcases = subcases[np.argmin(subcases[..., COST], axis=0), idx[:w]]
+        # Store and overwrite subcases with equal costs (<=) directly in the DP row view
+        feasible = (subcases[:, LAT] <= L) & (subcases[:, COST] <= DP[w, 1:w + 1, COST])
+        np.copyto(DP[w, 1:w + 1], subcases, where=feasible[:, None])
     # Index of optimal cost partition, the fist one if multiple min values exist
     k_opt = np.argmin(DP[n - 1, :, COST])
     _, opt_cost, opt_lat = DP[n - 1, k_opt]
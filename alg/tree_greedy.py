@@ -11,6 +11,7 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import functools
 import itertools
 import math
 
@@ -21,7 +22,7 @@ from alg.util import (isubtrees, ibacktrack_chain, ipowerset, path_blocks,
 from service.common import MEMORY, RUNTIME, RATE, PLATFORM
 
 
-def ichains_exhaustive(sg: nx.DiGraph, root: int, M: int, N: int) -> list[int]:
+def ichains_exhaustive(sg: nx.DiGraph, root: int, M: int, N: int) -> list[tuple[int, list[int]]]:
     """Calculate all combination of edge cuts and returns only if it is feasible wrt. the chain connectivity, M, and N.
     The calculation is improved compared to brute force to only start calculating cuts from c_min.
 
@@ -29,24 +30,28 @@ def ichains_exhaustive(sg: nx.DiGraph, root: int, M: int, N: int) -> list[int]:
     :param root:    root node of the graph
     :param M:       upper memory bound in MB
     :param N:       upper CPU core bound
-    :return:        generator of chain partitions
+    :return:        generator of chain partitions in the form of barrier nodes and related blocks
     """
-    c_min = math.ceil(sum(nx.get_node_attributes(sg, MEMORY).values()) / M) - 1
+    # Node memory and rate of the ingoing edge of each node for fast lookups
+    memory, rate = nx.get_node_attributes(sg, MEMORY), {v: r for _, v, r in sg.edges.data(RATE)}
+    c_min = max(math.ceil(sum(memory.values()) / M) - 1, 0)
     for cuts in ipowerset(sg.edges(range(1, len(sg))), start=c_min):
         barr = {root}.union(v for u, v in cuts)
+        # Keep the calculated subtrees of the partition to avoid recalculation
+        partition = []
         # Check whether the subtrees are chains and meet the memory requirement M and N
         for b, subtree in isubtrees(sg, barr):
             if max(d for _, d in subtree.out_degree) > 1:
                 break
-            memory, rate = zip(*[(sg.nodes[v][MEMORY], sg[u][v][RATE]) for u, v in
-                                 itertools.pairwise([next(sg.predecessors(b)), *sorted(list(subtree.nodes))])])
-            if block_memory(memory, 0, len(subtree) - 1) > M or block_cpu(rate, 0, len(subtree) - 1) > N:
+            partition.append((b, blk := sorted(list(subtree.nodes))))
+            if (block_memory([memory[v] for v in blk], 0, len(blk) - 1) > M
+                    or block_cpu([rate[v] for v in blk], 0, len(blk) - 1) > N):
                 break
         else:
-            yield barr
+            yield partition
 
 
-def ifeasible_chains(sg: nx.DiGraph, root: int, M: int, N: int) -> list[int]:
+def ifeasible_chains(sg: nx.DiGraph, root: int, M: int, N: int) -> list[tuple[int, list[int]]]:
     """Calculate only feasible chain partitions and returns the one which meets the limits M and N.
     The calculation is improved compared to brute force to only calculate chain partitions based on the branching nodes.
 
@@ -54,21 +59,27 @@ def ifeasible_chains(sg: nx.DiGraph, root: int, M: int, N: int) -> list[int]:
     :param root:    root node of the graph
     :param M:       upper memory bound in MB
     :param N:       upper CPU core bound
-    :return:        generator of chain partitions
+    :return:        generator of chain partitions in the form of barrier nodes and related blocks
     """
-    branch_edges = [itertools.chain(itertools.combinations(sg.succ[b], len(sg.succ[b]) - 1), [tuple(sg.successors(b))])
-                    for b in (v for v, d in sg.out_degree if d > 1)]
-    single_edges = ipowerset([v for v in sg.nodes if v != PLATFORM and sg.degree(next(sg.predecessors(v))) == 2])
+    # Node memory and rate of the ingoing edge of each node for fast lookups
+    memory, rate = nx.get_node_attributes(sg, MEMORY), {v: r for _, v, r in sg.edges.data(RATE)}
+    # Successors of branching nodes and the related cuts of all but one or all outgoing edges as reusable lists
+    branch_succs = [tuple(sg.successors(v)) for v, d in sg.out_degree if d > 1]
+    branch_edges = [[*itertools.combinations(succ, len(succ) - 1), succ] for succ in branch_succs]
+    single_edges = tuple(ipowerset([v for v in sg.nodes
+                                    if v != PLATFORM and sg.degree(next(sg.predecessors(v))) == 2]))
     for chain_cuts in itertools.product(*branch_edges, single_edges):
         barr = {root}.union(itertools.chain.from_iterable(chain_cuts))
+        # Keep the calculated subtrees of the partition to avoid recalculation
+        partition = []
         # Check whether the subtrees are chains and meet the memory requirement M and N
         for b, subtree in isubtrees(sg, barr):
-            memory, rate = zip(*[(sg.nodes[v][MEMORY], sg[u][v][RATE]) for u, v in
-                                 itertools.pairwise([next(sg.predecessors(b)), *sorted(list(subtree.nodes))])])
-            if block_memory(memory, 0, len(subtree) - 1) > M or block_cpu(rate, 0, len(subtree) - 1) > N:
+            partition.append((b, blk := sorted(list(subtree.nodes))))
+            if (block_memory([memory[v] for v in blk], 0, len(blk) - 1) > M
+                    or block_cpu([rate[v] for v in blk], 0, len(blk) - 1) > N):
                 break
         else:
-            yield barr
+            yield partition
 
 
 def greedy_tree_partitioning(sg: nx.DiGraph, root: int = 1, M: int = math.inf, N: int = math.inf,
@@ -85,23 +96,39 @@ def greedy_tree_partitioning(sg: nx.DiGraph, root: int = 1, M: int = math.inf, N
     :param cp_end:  tail node of the critical path in the form of subchain[root -> cp_end]
     :param delay:   invocation delay between blocks
     :param unit:    rounding unit for the cost calculation (default: 100 ms)
-    :param ichains: generator of chain partitions
+    :param ichains: generator of chain partitions in the form of barrier nodes and related blocks
     :return:        tuple of list of best partitions, sum cost of the partitioning, and resulted latency
     """
     best_res, best_cost = [([], math.inf, None)], math.inf
+    cpath = list(reversed(list(ibacktrack_chain(sg, root, cp_end))))
+    # Node runtime and rate of the ingoing edge of each node for fast lookups
+    runtime, rate = nx.get_node_attributes(sg, RUNTIME), {v: r for _, v, r in sg.edges.data(RATE)}
+
+    @functools.lru_cache(maxsize=None)
+    def cached_block_cost(blk: tuple[int]) -> int:
+        """Calculate cost of the given block that recurs in many partitionings"""
+        return block_cost([runtime[v] for v in blk], [rate[v] for v in blk], 0, len(blk) - 1, unit)
+
+    @functools.lru_cache(maxsize=None)
+    def cached_block_latency(blk: tuple[int]) -> int:
+        """Calculate latency of the given critical path block that recurs in many partitionings"""
+        return block_latency([runtime[v] for v in blk], 0, len(blk) - 1, delay, 0, len(blk) - 1)
+
     # Iterates over all possible cuttings
-    for barr in ichains(sg, root, M, N):
+    for subtrees in ichains(sg, root, M, N):
         partition = []
         sum_cost = 0
-        for b, st in isubtrees(sg, barr):
-            partition.append(sorted(list(st.nodes)))
-            runtime, rate = zip(*[(sg.nodes[v][RUNTIME], sg[u][v][RATE])
-                                  for u, v in itertools.pairwise([next(sg.predecessors(b)), *partition[-1]])])
-            sum_cost += block_cost(runtime, rate, 0, len(partition[-1]) - 1, unit)
+        for _, blk in subtrees:
+            partition.append(blk)
+            sum_cost += cached_block_cost(tuple(blk))
+            # No need to calculate the remaining blocks if the partial cost already exceeds the best cost
+            if sum_cost > best_cost:
+                break
+        if sum_cost > best_cost:
+            continue
         # Calculate blocks of critical path based on the partitioning
-        cp_block = path_blocks(partition, reversed(list(ibacktrack_chain(sg, root, cp_end))))
-        sum_lat = sum(block_latency([sg.nodes[v][RUNTIME] for v in blk], 0, len(blk) - 1, delay, 0, len(blk) - 1)
-                      for blk in cp_block) + (len(cp_block) - 1) * delay
+        cp_block = path_blocks(partition, cpath)
+        sum_lat = sum(cached_block_latency(tuple(blk)) for blk in cp_block) + (len(cp_block) - 1) * delay
         partition.sort()
         if sum_lat <= L:
             # Store partitioning with the same best cost for comparison
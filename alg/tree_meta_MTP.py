@@ -12,9 +12,10 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 import collections
+import functools
 import itertools
 import math
-import typing
+import operator
 
 import networkx as nx
 
@@ -23,15 +24,6 @@ from alg.util import ipostorder_dfs, isubchains, COST, extract_barriers, ibacktr
 from service.common import PLATFORM, RUNTIME, MEMORY, RATE, LABEL
 
 
-class TPart(typing.NamedTuple):
-    """Store subtree attributes for a given subcase"""
-    barr: set = set()  # Barrier/heading nodes of the given subtree partitioning
-    cost: int = math.inf  # Sum cost of the partitioning
-
-    def __repr__(self):
-        return repr(tuple(self))
-
-
 def mtp_tree_partitioning(sg: nx.DiGraph, root: int = 1, M: int = math.inf, N: int = math.inf, L: int = math.inf,
                           cp_end: int = None, delay: int = 1, unit: int = 100, only_barr: bool = False,
                           partition=chain_partitioning) -> tuple[list[int], int, int]:
@@ -53,51 +45,66 @@ def mtp_tree_partitioning(sg: nx.DiGraph, root: int = 1, M: int = math.inf, N: i
     :return:            tuple of barrier nodes, sum cost of the partitioning, and optimal number of cuts
     """
     sg = label_nodes(sg)
-    cpath = set(ibacktrack_chain(sg, root, cp_end))
+    # Node runtime, memory and rate of the ingoing edge of each node for fast lookups
+    sg_runtime, sg_memory = nx.get_node_attributes(sg, RUNTIME), nx.get_node_attributes(sg, MEMORY)
+    sg_rate = {v: r for _, v, r in sg.edges.data(RATE)}
+    # Nodes of the critical path mapped to their successor on the path -> m_cp = cpath[n]
+    cp_nodes = list(ibacktrack_chain(sg, root, cp_end))
+    cpath = {cp_nodes[0]: None, **{u: v for v, u in itertools.pairwise(cp_nodes)}}
     # c_max is the number of cuts allowed by L or at most the number of edges on cpath
-    c_max = math.floor(min((L - sum(sg.nodes[v][RUNTIME] for v in cpath)) / delay, len(cpath) - 1))
+    c_max = math.floor(min((L - sum(sg_runtime[v] for v in cpath)) / delay, len(cpath) - 1))
     # Check lower bound for latency limit
     if c_max < 0:
         return [], None, c_max
-    DP = collections.defaultdict(lambda: [TPart() for _ in range(c_max + 1)])
+    # Store subtree attributes of the subcases in separate tables -> DP_*[n][c]
+    # DP_barr: barrier/heading nodes of the given subtree partitioning as a bitset -> bit v is set if v is a barrier
+    # DP_cost: sum cost of the partitioning
+    DP_barr = collections.defaultdict(lambda: [0] * (c_max + 1))
+    DP_cost = collections.defaultdict(lambda: [math.inf] * (c_max + 1))
+    # Bind the parameters shared by all subchain partitionings
+    chain_part = functools.partial(partition, M=M, N=N, delay=delay, unit=unit)
     for pred, n in ipostorder_dfs(sg, PLATFORM):
         # Only branched nodes are referred in the subcases
         if len(sg.succ[pred]) <= 1 and pred != PLATFORM:
             continue
         # Subcases of leaves can be precalculated
-        if n in sg.nodes[root][LABEL]:
+        if sg.nodes[root][LABEL] >> n & 1:
             # For single nodes feasible solution exists by definition
-            _, opt_cost, _ = partition([sg.nodes[n][RUNTIME]], [sg.nodes[n][MEMORY]], [sg[pred][n][RATE]], M, N,
-                                       delay=delay, unit=unit)
-            DP[n] = [TPart({n}, opt_cost)] * (c_max if n == cp_end else 1)
+            _, opt_cost, _ = chain_part([sg_runtime[n]], [sg_memory[n]], [sg_rate[n]])
+            c_n = c_max if n == cp_end else 1
+            DP_barr[n], DP_cost[n] = [1 << n] * c_n, [opt_cost] * c_n
             continue
         for (head_part, tail_part), branches in isubchains(sg, n, cp_end):
             subchain = head_part + tail_part
-            runtime, memory, rate = zip(*[(sg.nodes[v][RUNTIME], sg.nodes[v][MEMORY], sg[u][v][RATE])
-                                          for u, v in itertools.pairwise([pred, *subchain])])
-            sum_m_cost = sum(DP[m][0].cost for m in branches if m not in cpath)
-            sum_m_barr = set().union(*(DP[m][0].barr for m in branches if m not in cpath))
+            runtime, memory, rate = ([sg_runtime[v] for v in subchain], [sg_memory[v] for v in subchain],
+                                     [sg_rate[v] for v in subchain])
+            # Aggregate the best subcases of the branches not involved in cpath in one pass
+            sum_m_cost, sum_m_barr = 0, 0
+            for m in branches:
+                if m not in cpath:
+                    sum_m_cost += DP_cost[m][0]
+                    sum_m_barr |= DP_barr[m][0]
             # Subchain has no intersection with cpath -> no need to track cuts
             if n not in cpath:
                 # Without L, there should exist feasible solution wrt. M
-                barr, opt_cost, _ = partition(runtime, memory, rate, M, N, delay=delay, unit=unit)
-                if (sum_cost := opt_cost + sum_m_cost) < DP[n][0].cost:
-                    DP[n][0] = TPart({subchain[b] for b in barr} | sum_m_barr, sum_cost)
+                barr, opt_cost, _ = chain_part(runtime, memory, rate)
+                if (sum_cost := opt_cost + sum_m_cost) < DP_cost[n][0]:
+                    DP_barr[n][0], DP_cost[n][0] = chain_bits(subchain, barr) | sum_m_barr, sum_cost
             # Subchain is the tail part of cpath -> all inner edges are allowed to be merged
             elif subchain[-1] == cp_end:
                 # If subchain is the cpath -> partitioning can be calculated directly applying L
                 if subchain[0] == root:
-                    barr, opt_cost, opt_lat = partition(runtime, memory, rate, M, N, L, delay=delay, unit=unit)
+                    barr, opt_cost, opt_lat = chain_part(runtime, memory, rate, L=L)
                     if not barr:
                         return [], opt_cost, opt_lat
-                    opt_barr_cost = TPart({subchain[b] for b in barr} | sum_m_barr, sum_cost := opt_cost + sum_m_cost)
+                    opt_barr, sum_cost = chain_bits(subchain, barr) | sum_m_barr, opt_cost + sum_m_cost
                     for c in range(len(barr) - 1, c_max + 1):
-                        if sum_cost < DP[n][c].cost:
-                            DP[n][c] = opt_barr_cost
+                        if sum_cost < DP_cost[n][c]:
+                            DP_barr[n][c], DP_cost[n][c] = opt_barr, sum_cost
                 else:
                     # Without L, there should exist feasible solution wrt. M
-                    CDP, *_ = partition(runtime, memory, rate, M, N, delay=delay, unit=unit, ret_dp=True)
-                    c_best, part_best = 0, None
+                    CDP, *_ = chain_part(runtime, memory, rate, ret_dp=True)
+                    c_best, barr_best, cost_best = 0, None, math.inf
                     for c in range(c_max + 1):
                         if c < len(subchain):
                             # No need to track infeasible solutions
@@ -105,65 +112,75 @@ def mtp_tree_partitioning(sg: nx.DiGraph, root: int = 1, M: int = math.inf, N: i
                                 continue
                             # If c-1 cuts give cheaper solution -> it must be involved in the at most c cuts solution
                             elif c == 0 or CDP[-1][c][COST] < CDP[-1][c_best][COST]:
-                                part_best = TPart({subchain[b] for b in extract_barriers(CDP, c)} | sum_m_barr,
-                                                  CDP[-1][c][COST] + sum_m_cost)
+                                barr_best = chain_bits(subchain, extract_barriers(CDP, c)) | sum_m_barr
+                                cost_best = CDP[-1][c][COST] + sum_m_cost
                                 c_best = c
-                        if part_best.cost < DP[n][c].cost:
-                            DP[n][c] = part_best
+                        if cost_best < DP_cost[n][c]:
+                            DP_barr[n][c], DP_cost[n][c] = barr_best, cost_best
             # Subchain head is part of cpath -> a must cut edge is introduced
             else:
-                m_cp = next(m for m in sg.succ[head_part[-1]] if m in cpath)
-                c_cache = {}
+                m_cp = cpath[head_part[-1]]
+                # Cache of head part partitionings -> c_head: (barrier bitset, cost) and the largest infeasible c_head
+                c_cache, c_infeasible = {}, -1
+                # Latency of the head part without cuts
+                lat_head = sum(runtime[:len(head_part)])
                 # Iterate over all feasible cut solution of the subtree T_m_cp
                 for k in range(0, c_max):
                     # If the subtree cannot be partitioned with k cuts -> all k-related subcases are infeasible
-                    if DP[m_cp][k].cost == math.inf:
+                    if DP_cost[m_cp][k] == math.inf:
                         continue
                     # If the optimal partition cost for k equals to k+1 -> k+1 subcases will the same or more expensive
                     # For given k -> each calculated c cuts are also calculated for k-1 (k->1-c_max, k+1->2-c_max, ...)
-                    if k > 0 and DP[m_cp][k - 1].cost <= DP[m_cp][k].cost:
+                    if k > 0 and DP_cost[m_cp][k - 1] <= DP_cost[m_cp][k]:
                         continue
                     # Iterate over all possible cuts on the head_part of the subchain
                     for c_head in reversed(range(0, c_max - k)):
+                        # Stricter L_head than a previously infeasible one is also infeasible
+                        if c_head <= c_infeasible:
+                            break
                         # Use previously calculated result
                         if c_head in c_cache:
-                            barr, opt_cost = c_cache[c_head]
+                            head_barr, opt_cost = c_cache[c_head]
                         else:
-                            L_head = sum(sg.nodes[v][RUNTIME] for v in head_part) + c_head * delay
-                            barr, opt_cost, _ = partition(runtime, memory, rate, M, N, L_head, 0, len(head_part) - 1,
-                                                          delay, unit)
+                            L_head = lat_head + c_head * delay
+                            barr, opt_cost, _ = chain_part(runtime, memory, rate, L=L_head, start=0,
+                                                           end=len(head_part) - 1)
                             # If subchain cannot be partitioned with L_head -> stricter L_head is also infeasible
                             if barr is None:
+                                c_infeasible = c_head
                                 break
+                            head_barr = chain_bits(subchain, barr)
                             # Precalculate stricter solutions based on the distance between optimal cut and L_head cut
                             for _c in reversed(range(len(barr) - 1, c_head + 1)):
-                                c_cache[_c] = (barr, opt_cost)
+                                c_cache[_c] = (head_barr, opt_cost)
                         c = k + c_head + 1
-                        if (sum_cost := opt_cost + DP[m_cp][k].cost + sum_m_cost) < DP[n][c].cost:
-                            DP[n][c] = TPart({subchain[b] for b in barr}.union(DP[m_cp][k].barr, sum_m_barr), sum_cost)
+                        if (sum_cost := opt_cost + DP_cost[m_cp][k] + sum_m_cost) < DP_cost[n][c]:
+                            DP_barr[n][c] = head_barr | DP_barr[m_cp][k] | sum_m_barr
+                            DP_cost[n][c] = sum_cost
         # If no feasible solution exists for the subtree T_n wrt. L (c_0, c_max = inf) -> no feasible solution for T
-        if min(DP[n][0], DP[n][-1]) == math.inf:
+        if min(DP_cost[n][0], DP_cost[n][-1]) == math.inf:
             return [], math.inf, None
-    c_opt = min(range(len(DP[root])), key=lambda _c: DP[root][_c].cost)
-    best_barrs, best_cost = DP[root][c_opt]
+    # Index of optimal cost partition, the first one if multiple min values exist
+    c_opt = DP_cost[root].index(best_cost := min(DP_cost[root]))
+    best_barrs = {v for v in sg.nodes if v != PLATFORM and DP_barr[root][c_opt] >> v & 1}
     return list(best_barrs) if only_barr else recreate_barr_blocks(sg, best_barrs), best_cost, c_opt
 
 
+def chain_bits(chain: list[int], barr: list[int]) -> int:
+    """Convert the barrier indices of the given *chain* into a bitset of barrier nodes"""
+    return functools.reduce(operator.or_, (1 << chain[b] for b in barr), 0)
+
+
 def recreate_barr_blocks(sg: nx.DiGraph, barr: list) -> list[list[int]]:
     """Recreate chain blocks from barrier nodes of the given partitioning"""
-    n = list(sg.nodes)
-    p = []
     if not barr:
         return []
-    for w in reversed(range(1, len(n))):
-        if n[w] == 0:
-            continue
-        n[w], blk, v = 0, [w], w
-        while v not in barr:
-            v = next(sg.predecessors(v))
-            if n[v]:
-                n[v] = 0
-                blk.append(v)
-        blk.reverse()
-        p.append(blk)
-    return sorted(p)
+    # Each node belongs to the block of the largest node that can reach it upward without crossing a barrier
+    tail = {}
+    for _, v in ipostorder_dfs(sg, PLATFORM):
+        tail[v] = max(v, max((tail[c] for c in sg.succ[v] if c not in barr), default=v))
+    blocks = collections.defaultdict(list)
+    # Reversed postorder -> nodes of a block are collected from its barrier downward
+    for v in reversed(tail):
+        blocks[tail[v]].append(v)
+    return sorted(blocks.values())
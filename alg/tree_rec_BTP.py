@@ -12,7 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 import collections
-import functools
+import itertools
 import math
 import typing
 
@@ -53,28 +53,30 @@ def btp_tree_partitioning(sg: nx.DiGraph, root: int = 1, M: int = math.inf, N: i
     :param full:    return full blocks or just their ending nodes
     :return:        tuple of optimal partition, sum cost of the partitioning, and optimal number of cuts
     """
-    cpath = set(ibacktrack_chain(sg, root, cp_end))
+    # Node runtime, memory and rate of the ingoing edge of each node for fast lookups
+    sg_runtime, sg_memory = nx.get_node_attributes(sg, RUNTIME), nx.get_node_attributes(sg, MEMORY)
+    sg_rate = {v: r for _, v, r in sg.edges.data(RATE)}
+    # Nodes of the critical path mapped to their successor on the path -> m_cp = cpath[n]
+    cp_nodes = list(ibacktrack_chain(sg, root, cp_end))
+    cpath = {cp_nodes[0]: None, **{u: v for v, u in itertools.pairwise(cp_nodes)}}
     # c_max is the number of cuts allowed by L or at most the number of edges on cpath
-    c_max = math.floor(min((L - sum(sg.nodes[_v][RUNTIME] for _v in cpath)) / delay, len(cpath) - 1))
+    c_max = math.floor(min((L - sum(sg_runtime[_v] for _v in cpath)) / delay, len(cpath) - 1))
     # Check lower bound for latency limit
     if c_max < 0:
         return [], None, c_max
-    DP = [collections.defaultdict(collections.deque) for _ in range(len(sg))]
-    for i in range(len(DP)):
-        DP[i][0].append(TBlock())
+    # Queues of subcases of each node indexed by the number of cuts -> DP[n][c] with the default subcase for c = 0
+    DP = [[collections.deque((TBlock(),))] for _ in range(len(sg))]
 
-    @functools.lru_cache(maxsize=(len(sg) - 1))
-    def block_cost(pred: int, barr: int, cumsum: int, expand: bool = True) -> tuple[int, int]:
+    def block_cost(barr: int, cumsum: int, expand: bool = True) -> tuple[int, int]:
         """Calculate sum cost of subtree: T_barr and also return the cumulative sum runtime of the block[barr, w]"""
         if expand:
-            cumsum += sg.nodes[barr][RUNTIME]
-        return sg[pred][barr][RATE] * (math.ceil(cumsum / unit) * unit), cumsum
+            cumsum += sg_runtime[barr]
+        return sg_rate[barr] * (-(-cumsum // unit) * unit), cumsum
 
-    @functools.lru_cache(maxsize=(len(sg) - 1))
-    def block_cpu(pred: int, node: int, max_rate: int, cpu: int) -> tuple[int, int]:
+    def block_cpu(node: int, max_rate: int, cpu: int) -> tuple[int, int]:
         """Calculate the nex CPU core need of the block[barr, w] and also return the max internal rate"""
-        blk_max_rate = max(max_rate, sg[pred][node][RATE])
-        return max(cpu, math.ceil(blk_max_rate / sg[pred][node][RATE])), blk_max_rate
+        blk_max_rate = max(max_rate, sg_rate[node])
+        return max(cpu, -(-blk_max_rate // sg_rate[node])), blk_max_rate
 
     def qmin(node: int, c_n: int) -> int:
         """Return the sum cost of best/min subcase for *node* with *c_n* cuts."""
@@ -83,27 +85,29 @@ def btp_tree_partitioning(sg: nx.DiGraph, root: int = 1, M: int = math.inf, N: i
     def qinsert(node: int, c_n: int, blk: TBlock):
         """Insert given block subcase *block* into *DP* for the *node* with *c_n* cuts."""
         if blk.sum_cost < math.inf and blk.mem <= M and blk.cpu <= N:
-            if len(DP[node][c_n]) and blk.sum_cost <= qmin(node, c_n):
-                DP[node][c_n].appendleft(blk)
+            queue = DP[node][c_n]
+            if queue and blk.sum_cost <= queue[0].sum_cost:
+                queue.appendleft(blk)
             else:
-                DP[node][c_n].append(blk)
+                queue.append(blk)
 
-    def qmerge(pred: int, node: int, c_n: int, barr: int, c_b: int, m_cost: int):
+    def qmerge(node: int, c_n: int, barr: int, c_b: int, m_cost: int):
         """Copy DP entries from queue of node *barr* with *c_b* cuts into queue of node *node* with *c_n* cuts
         while leaving the best subcase in the original queue."""
         for blk in DP[barr][c_b]:
             # Ignore infeasible subcases
             if blk.sum_cost < math.inf:
+                # Calculate the new memory and skip the expanded block[node, w] early if it violates M
+                if (n_blk_mem := blk.mem + sg_memory[node]) > M:
+                    continue
                 # Calculate the original cost of the block[barr, w]
-                b_blk_cost, _ = block_cost(node, barr, blk.cumsum, expand=False)
+                b_blk_cost, _ = block_cost(barr, blk.cumsum, expand=False)
                 # Calculate the cost of the expanded block[node, w], n -> barr
-                n_blk_cost, n_blk_cumsum = block_cost(pred, node, blk.cumsum)
+                n_blk_cost, n_blk_cumsum = block_cost(node, blk.cumsum)
                 # Calculate the new sum_cost
                 n_sum_cost = blk.sum_cost + (n_blk_cost - b_blk_cost) + m_cost
-                # Calculate the new memory
-                n_blk_mem = blk.mem + sg.nodes[node][MEMORY]
                 # Calculate the new CPU need
-                blk_cpu, blk_max_rate = block_cpu(pred, node, blk.max_rate, blk.cpu)
+                blk_cpu, blk_max_rate = block_cpu(node, blk.max_rate, blk.cpu)
                 qinsert(node, c_n, TBlock(blk.w, n_sum_cost, n_blk_cumsum, n_blk_mem, blk_max_rate, blk_cpu))
         # If no feasible solution exists with c cuts -> add default with infinity cost
         if not DP[node][c_n]:
@@ -115,28 +119,30 @@ def btp_tree_partitioning(sg: nx.DiGraph, root: int = 1, M: int = math.inf, N: i
         DP[node][c_n].clear()
         DP[node][c_n].append(best_blk)
 
-    for p, n in ipostorder_dfs(sg, PLATFORM):
-        n_mem, n_rate = sg.nodes[n][MEMORY], sg[p][n][RATE]
+    for _, n in ipostorder_dfs(sg, PLATFORM):
+        n_mem, n_rate = sg_memory[n], sg_rate[n]
         # Subcases of leaves can be precalculated to store the single block -> [n]
         if len(sg.succ[n]) < 1:
-            sum_n_cost, n_cumsum = block_cost(p, n, 0)
+            sum_n_cost, n_cumsum = block_cost(n, 0)
             qinsert(n, 0, TBlock(n, sum_n_cost, n_cumsum, n_mem, n_rate, 1))
             continue
         # Sum best subcases of n's successors not involved in cpath
         sum_m_cost = sum(qmin(m, 0) for m in sg.succ[n] if m not in cpath)
         if n not in cpath:
             # Single block subcase -> [n] + sum(m): n -> m
-            n_cost, n_cumsum = block_cost(p, n, 0)
+            n_cost, n_cumsum = block_cost(n, 0)
             sum_n_cost = n_cost + sum_m_cost
             qinsert(n, 0, TBlock(n, sum_n_cost, n_cumsum, n_mem, n_rate, 1))
             # Merged subcases -> [n] U [b -> w] + sum(m): n -> b, n -> m, m != b
             for b in sg.succ[n]:
-                qmerge(p, n, 0, b, 0, m_cost=sum_m_cost - qmin(b, 0))
+                qmerge(n, 0, b, 0, m_cost=sum_m_cost - qmin(b, 0))
                 qclear(b, 0)
         else:
             # Cut subcase -> [n] + m_cp + sum(m\m_cp): n -> m, m != m_cp
-            n_cost, n_cumsum = block_cost(p, n, 0)
-            m_cp = next(m for m in sg.succ[n] if m in cpath)
+            n_cost, n_cumsum = block_cost(n, 0)
+            m_cp = cpath[n]
+            # Subcases of n can have at most one more cut than m_cp's subcases
+            DP[n].extend(collections.deque() for _ in range(min(len(DP[m_cp]), c_max)))
             # Since n -> b is a cut, at most c_max-1 subcases should be referenced
             for c in range(1, min(len(DP[m_cp]), c_max) + 1):
                 sum_n_cost = n_cost + sum_m_cost + qmin(m_cp, c - 1)
@@ -145,25 +151,31 @@ def btp_tree_partitioning(sg: nx.DiGraph, root: int = 1, M: int = math.inf, N: i
             for b in sg.succ[n]:
                 if b == m_cp:
                     for c in range(0, min(len(DP[m_cp]), c_max + 1)):
-                        qmerge(p, n, c, b, c, m_cost=sum_m_cost)
+                        qmerge(n, c, b, c, m_cost=sum_m_cost)
                         qclear(b, c)
                 else:
                     m_res_cost = sum_m_cost - qmin(b, 0)
                     # Subcases of node b with 0 cut is reused to calculate subcases with different number of cuts
                     for c in range(1, min(len(DP[m_cp]), c_max) + 1):
-                        qmerge(p, n, c, b, 0, m_cost=m_res_cost + qmin(m_cp, c - 1))
+                        qmerge(n, c, b, 0, m_cost=m_res_cost + qmin(m_cp, c - 1))
                     qclear(b, 0)
-    c_opt = min(DP[root], key=lambda _c: qmin(root, _c))
-    if qmin(root, c_opt) < math.inf:
-        return extract_blocks(sg, DP, root, cp_end, c_opt, full), qmin(root, c_opt), c_opt
+    # Index of optimal cost partition, the first one if multiple min values exist
+    root_costs = [q[0].sum_cost for q in DP[root]]
+    c_opt = root_costs.index(opt_cost := min(root_costs))
+    if opt_cost < math.inf:
+        return extract_blocks(sg, DP, root, cp_end, c_opt, full, cpath), opt_cost, c_opt
     else:
         return [], math.inf, c_opt
 
 
-def extract_blocks(sg: nx.DiGraph, DP: list[dict], root: int, cp_end: int, c_opt: int, full: bool = True) -> list[int]:
+def extract_blocks(sg: nx.DiGraph, DP: list[list[collections.deque]], root: int, cp_end: int, c_opt: int,
+                   full: bool = True, cpath: typing.Container[int] = None) -> list[int]:
     """Extract subtree roots of partitioning from the tailing nodes stored in the *DP* matrix"""
     n = {v for v in sg.nodes if v != PLATFORM}
-    cpath = set(ibacktrack_chain(sg, root, cp_end))
+    # Reuse the critical path of the partitioning if it is given
+    cpath = cpath if cpath is not None else set(ibacktrack_chain(sg, root, cp_end))
+    # Predecessor of each node in the tree
+    parent = {v: u for u, v in sg.edges}
     p = []
     barr = {(root, c_opt)}
     while len(n):
@@ -178,7 +190,7 @@ def extract_blocks(sg: nx.DiGraph, DP: list[dict], root: int, cp_end: int, c_opt
                 blk.append(w)
             n.remove(w)
             prior = w
-            w = next(sg.predecessors(w))
+            w = parent[w]
         if blk[-1] != b:
             blk.append(b)
         blk.reverse()
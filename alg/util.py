@@ -12,9 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 import collections
-import functools
 import itertools
-import math
 
 import networkx as nx
 
@@ -22,8 +20,6 @@ from service.common import LABEL, PLATFORM
 
 # Constants for attribute indices in DP matrix
 BARR, COST, LAT = 0, 1, 2
-# Constant for block cache index
-MEM, CPU = 0, 3
 
 
 def ipowerset(data: list[int], start: int = 0) -> list[int]:
@@ -44,23 +40,24 @@ def block_memory(memory: list[int], b: int, w: int) -> int:
 
 def block_cost(runtime: list[int], rate: list[int], b: int, w: int, unit: int = 100) -> int:
     """Calculate running time of block [b,w]"""
-    return rate[b] * (math.ceil(sum(runtime[b: w + 1]) / unit) * unit)
+    return rate[b] * (-(-sum(runtime[b: w + 1]) // unit) * unit)
 
 
 def block_latency(runtime: list[int], b: int, w: int, delay: int, start: int, end: int) -> int:
     """Calculate relevant latency for block [b,w]"""
-    if end < b or w < start:
-        # Do not consider latency if no intersection
-        return 0
-    blk_lat = sum(runtime[max(b, start): min(w, end) + 1])
-    # Ignore delay if latency path starts within the subchain
-    return delay + blk_lat if start < b else blk_lat
+    # Do not consider latency if no intersection and ignore delay if latency path starts within the subchain
+    lo, hi = max(b, start), min(w, end)
+    return (lo <= hi) * (sum(runtime[lo: hi + 1]) + (start < b) * delay)
 
 
 def block_cpu(rate: list[int], b: int, w: int) -> int:
     """Calculate CPU core need of block [b,w]"""
-    r_max = itertools.chain((1,), enumerate(itertools.accumulate(reversed(rate[b: w + 1]), max)))
-    return functools.reduce(lambda pre, max_i: max(pre, math.ceil(max_i[1] / rate[w - max_i[0]])), r_max)
+    r_max, cpu = 0, 1
+    # Running max of rates and CPU needs in reversed order: w -> b
+    for r in reversed(rate[b: w + 1]):
+        r_max = max(r_max, r)
+        cpu = max(cpu, -(-r_max // r))
+    return cpu
 
 
 def isubtrees(tree: nx.DiGraph, barr: set[int]) -> tuple[int, nx.DiGraph]:
@@ -80,62 +77,61 @@ def isubtrees(tree: nx.DiGraph, barr: set[int]) -> tuple[int, nx.DiGraph]:
 def ibacktrack_chain(tree: nx.DiGraph, start: int, leaf: int) -> list[int]:
     """Return the node of a chain in the *tree* in backward order from *leaf* to *start* node"""
     last = leaf
-    while last != start:
+    # Each node of the tree has at most one predecessor
+    while last != start and (pred := tree.pred[last]):
         yield last
-        try:
-            last = next(tree.predecessors(last))
-        except StopIteration:
-            break
+        last, = pred
     yield last
 
 
 def path_blocks(partition: list[list[int]], path: list[int]) -> list[list[int]]:
     """Calculate the blocks of separated critical path based on the original partitioning"""
+    # Index of the block of each node to avoid scanning the partition for every path node
+    node_blk = {v: i for i, blk in enumerate(partition) for v in blk}
     parts = []
     current_blk = None
     for v in path:
-        for blk in partition:
-            if v in blk:
-                if blk == current_blk:
-                    parts[-1].append(v)
-                else:
-                    parts.append([v])
-                    current_blk = blk
+        if (blk := node_blk.get(v)) is None:
+            continue
+        if blk == current_blk:
+            parts[-1].append(v)
+        else:
+            parts.append([v])
+            current_blk = blk
     return parts
 
 
 def ipostorder_dfs(tree: nx.DiGraph, source: int) -> tuple[int, int]:
     """Return nodes and its existing predecessor in DFS traversal of the given *tree* in a post/reversed order"""
-    stack = collections.deque([(source, iter(tree[source]))])
+    # Reversed preorder traversal visiting the children in reversed order gives the postorder traversal
+    order, stack = [], [(source, c) for c in tree.succ[source]]
     while stack:
-        v, ichildren = stack[-1]
-        try:
-            c = next(ichildren)
-            stack.append((c, iter(tree[c])))
-        except StopIteration:
-            stack.pop()
-            if stack:
-                yield stack[-1][0], v
+        p, v = stack.pop()
+        order.append((p, v))
+        stack.extend((v, c) for c in tree.succ[v])
+    yield from reversed(order)
 
 
 def isubchains(tree: nx.DiGraph, start: int, leaf: int = None) -> tuple[(list[int], list[int]), set[int]]:
     """Generator over the subchains and its branches from *start* to all reachable leaf where the subchain is bisected
         at the last node from which the specific *leaf* is still reachable"""
-    chain = [start]
-    while (deg := len(tree.succ[chain[-1]])) == 1:
-        chain.append(next(tree.successors(chain[-1])))
-    if deg == 0:
-        yield (chain, []), set()
-    else:
-        for c in (children := set(tree.successors(chain[-1]))):
-            nbr = children - {c}
-            for (part1, part2), branches in isubchains(tree, c, leaf):
-                if leaf in tree.nodes[part1[0]][LABEL]:
-                    yield (chain + part1, part2), nbr | branches
-                elif leaf is not None:
-                    yield (chain, part1 + part2), nbr | branches
-                else:
-                    yield (chain + part1, []), nbr | branches
+    # Subchain of the current path, the stack of chain heads to visit, their offset, head length and branches
+    chain, stack = [], [(start, 0, 0, set())]
+    while stack:
+        v, offset, head_len, branches = stack.pop()
+        del chain[offset:]
+        chain.append(v)
+        while (deg := len(tree.succ[chain[-1]])) == 1:
+            chain.append(next(tree.successors(chain[-1])))
+        # The subchain is bisected at the last node from which the leaf is still reachable
+        if leaf is None or v == start or (head_len == offset and tree.nodes[v][LABEL] >> leaf & 1):
+            head_len = len(chain)
+        if deg == 0:
+            yield (chain[:head_len], chain[head_len:]), branches
+        else:
+            children = set(tree.successors(chain[-1]))
+            for c in reversed(list(children)):
+                stack.append((c, len(chain), head_len, branches | (children - {c})))
 
 
 def extract_barriers(DP: list[list[tuple[int, int, int]]], k: int) -> list[int]:
@@ -152,9 +148,12 @@ def extract_barriers(DP: list[list[tuple[int, int, int]]], k: int) -> list[int]:
 
 
 def label_nodes(tree: nx.DiGraph) -> nx.DiGraph:
-    """Label each node *n* with the set of leafs that can be reached from *n*"""
+    """Label each node *n* with the set of leafs that can be reached from *n* in the form of a bitset"""
     for _, n in ipostorder_dfs(tree, PLATFORM):
-        tree.nodes[n][LABEL] = set().union(*(tree.nodes[m][LABEL] for m in tree.succ[n])) if len(tree.succ[n]) else {n}
+        label = 0 if len(tree.succ[n]) else 1 << n
+        for m in tree.succ[n]:
+            label |= tree.nodes[m][LABEL]
+        tree.nodes[n][LABEL] = label
     return tree
 
 
@@ -169,7 +168,7 @@ def ichain(tree: nx.DiGraph, start: int, leaf: int) -> list[int]:
     while n != leaf:
         yield n
         for c in tree.successors(n):
-            if leaf in tree.nodes[c][LABEL]:
+            if tree.nodes[c][LABEL] >> leaf & 1:
                 n = c
                 break
     yield leaf
@@ -14,13 +14,18 @@
 # limitations under the License.
 import functools
 import itertools
-import multiprocessing
+import multiprocessing.pool
 import os
 import random
 import time
 
+import numpy as np
+
 from func import test_function, STD
 
+# Random generator of the service parameters
+rng = np.random.default_rng()
+
 
 def create_service(partition: list[list[tuple[int, int, int]]]) -> list:
     """Generate groups of functions with randomized arguments"""
@@ -30,34 +35,56 @@ def create_service(partition: list[list[tuple[int, int, int]]]) -> list:
 
 def create_random_service(n: int, c: int, runtime=(10, 100), rate=(1, 3)) -> list:
     """Generate randomized service parameters based on a randomized partition of *n* function with *c* cuts"""
-    barriers = [0] + sorted(random.sample(population=range(1, n), k=c - 1))
-    partition = [[(f, random.randint(*runtime), random.randint(*rate)) for f in range(b, w)]
-                 for b, w in itertools.pairwise(barriers + [n])]
+    barriers = [0, *np.sort(rng.choice(np.arange(1, n), size=c - 1, replace=False)).tolist()]
+    runtimes = rng.integers(*runtime, size=n, endpoint=True).tolist()
+    rates = rng.integers(*rate, size=n, endpoint=True).tolist()
+    partition = [[(f, runtimes[f], rates[f]) for f in range(b, w)] for b, w in itertools.pairwise(barriers + [n])]
     return create_service(partition=partition)
 
 
 ########################################################################################################################
 
-def execute_group(name: str, funcs: list, param: int, cpu: int = os.cpu_count()) -> list[int]:
+def create_pool(cpu: int = os.cpu_count()) -> multiprocessing.pool.Pool:
+    """Create a worker pool preferably with fork-based workers"""
+    method = 'fork' if 'fork' in multiprocessing.get_all_start_methods() else 'spawn'
+    return multiprocessing.get_context(method).Pool(cpu)
+
+
+def execute_group(name: str, funcs: list, param: int, cpu: int = os.cpu_count(),
+                  pool: multiprocessing.pool.Pool = None) -> list[int]:
     """Execute one group of functions in a fully-parallelized manner"""
+    if pool is None:
+        # Without a shared pool, the group runs on its own workers
+        with create_pool(cpu) as pool:
+            return execute_group(name, funcs, param, cpu, pool)
     print(f"GROUP({name}) execution initiated at {time.time()}")
     data = [param]
     for func in funcs:
-        with multiprocessing.Pool(cpu) as pool:
-            output = pool.map(func=func, iterable=data)
+        # Dispatching to the pool does not pay off for single inputs -> call the function in-process
+        if cpu == 1 or len(data) <= 1:
+            output = map(func, data)
+        else:
+            # Send inputs in batches to reduce the per-task IPC overhead -> chunksize = N // (cpu + 2)
+            # Results are consumed as they arrive since their order is irrelevant for the next function
+            output = pool.imap_unordered(func, data, chunksize=max(1, len(data) // (cpu + 2)))
         data = list(itertools.chain.from_iterable(output))
     print(f"GROUP({name}) execution ended at {time.time()}")
     return data
 
 
-def execute_service_path(partition: list[list[int]], delay: int, init_data: int) -> int:
+def execute_service_path(partition: list[list[int]], delay: int, init_data: int,
+                         pool: multiprocessing.pool.Pool = None) -> int:
     """Execute given service as one path without the cloud-platform parallelization"""
+    if pool is None:
+        # Workers are shared by all groups of the service path
+        with create_pool() as pool:
+            return execute_service_path(partition, delay, init_data, pool)
     print(f"SERVICE execution initiated at {time.time()} with input: {init_data}")
     data = init_data
     for i, group in enumerate(partition):
         # Platform invocation delay
         time.sleep(delay / 1000)
-        output = execute_group(name=f"GP{i}", funcs=group, param=data)
+        output = execute_group(name=f"GP{i}", funcs=group, param=data, pool=pool)
         # Only choose one data from the output for the simulation
         data = output[random.randint(0, len(output) - 1)]
     print(f"SERVICE execution ended at {time.time()} with output: {data}")
@@ -66,9 +93,11 @@ def execute_service_path(partition: list[list[int]], delay: int, init_data: int)
 
 def simulate(service: list[list], inv_delay: int = 10, input_data: int = 42) -> int:
     print(f">>> Start simulation")
-    t_start = time.time()
-    output = execute_service_path(partition=service, delay=inv_delay, init_data=input_data)
-    t_end = time.time()
+    # Workers are started in advance and live for the whole simulation
+    with create_pool() as pool:
+        t_start = time.time()
+        output = execute_service_path(partition=service, delay=inv_delay, init_data=input_data, pool=pool)
+        t_end = time.time()
     print(f"\n>>> Sum simulation time: {1000 * (t_end - t_start)} ms")
     return output
 
@@ -11,23 +11,37 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-import random
 import time
 
 import networkx as nx
+import numpy as np
 
 from service.common import *
 
+# Random generator of the node and edge attributes
+rng = np.random.default_rng()
+
+
+def seed_rng(seed: int = None):
+    """Reseed the random generator of the attributes, e.g., for reproducible runs in worker processes"""
+    global rng
+    rng = np.random.default_rng(seed)
+
+
+def random_ints(interval: tuple[int, int], size: int) -> list[int]:
+    """Generate *size* random integers from the closed *interval* at once"""
+    return rng.integers(*interval, size=size, endpoint=True).tolist()
+
 
 def get_random_chain(nodes: int = 10, runtime: tuple[int, int] = (1, 100), memory: tuple[int, int] = (1, 3),
                      rate: tuple[int, int] = (1, 3), data: tuple[int, int] = (1, 20)) -> nx.DiGraph:
     """Generate random chain(path graph) with properties from given intervals"""
     chain = nx.path_graph(range(0, nodes + 1), nx.DiGraph)
-    nx.set_node_attributes(chain, {i: random.randint(*runtime) for i in range(1, nodes + 1)}, RUNTIME)
-    nx.set_node_attributes(chain, {i: random.randint(*memory) for i in range(1, nodes + 1)}, MEMORY)
-    for _, _, d in chain.edges(data=True):
-        d[RATE] = random.randint(*rate)
-        d[DATA] = random.randint(*data)
+    # Set all node and edge attributes at once with dict of dicts
+    node_attrs = zip(random_ints(runtime, nodes), random_ints(memory, nodes))
+    nx.set_node_attributes(chain, {i: {RUNTIME: t, MEMORY: m} for i, (t, m) in enumerate(node_attrs, start=1)})
+    edge_attrs = zip(random_ints(rate, nodes), random_ints(data, nodes))
+    nx.set_edge_attributes(chain, {e: {RATE: r, DATA: d} for e, (r, d) in zip(chain.edges, edge_attrs)})
     chain = nx.relabel_nodes(chain, {0: PLATFORM})
     chain.graph[NAME] = "random_chain"
     return chain
@@ -36,15 +50,16 @@ def get_random_chain(nodes: int = 10, runtime: tuple[int, int] = (1, 100), memor
 def get_random_tree(nodes: int = 20, runtime: tuple[int, int] = (1, 100), memory: tuple[int, int] = (1, 3),
                     rate: tuple[int, int] = (1, 3), data: tuple[int, int] = (1, 20)) -> nx.DiGraph:
     """Generate random tree(from Prüfer sequence) with properties from given intervals"""
-    raw_tree = nx.bfs_tree(nx.random_tree(nodes + 1), 0)
-    while raw_tree.out_degree[0] > 1:
-        raw_tree = nx.bfs_tree(nx.random_tree(nodes + 1), 0)
-    tree = nx.convert_node_labels_to_integers(raw_tree, first_label=0)
-    nx.set_node_attributes(tree, {i: random.randint(*runtime) for i in range(1, nodes + 1)}, RUNTIME)
-    nx.set_node_attributes(tree, {i: random.randint(*memory) for i in range(1, nodes + 1)}, MEMORY)
-    for _, _, d in tree.edges(data=True):
-        d[RATE] = random.randint(*rate)
-        d[DATA] = random.randint(*data)
+    # Uniform random tree of the functions connected to the platform node at a uniform random function
+    # -> uniform random tree in which the platform is a leaf, without rejection sampling
+    raw_tree = nx.from_prufer_sequence(random_ints((0, nodes - 1), nodes - 2)) if nodes > 1 else nx.empty_graph(1)
+    raw_tree.add_edge(nodes, int(rng.integers(nodes)))
+    tree = nx.convert_node_labels_to_integers(nx.bfs_tree(raw_tree, nodes), first_label=0)
+    # Set all node and edge attributes at once with dict of dicts
+    node_attrs = zip(random_ints(runtime, nodes), random_ints(memory, nodes))
+    nx.set_node_attributes(tree, {i: {RUNTIME: t, MEMORY: m} for i, (t, m) in enumerate(node_attrs, start=1)})
+    edge_attrs = zip(random_ints(rate, nodes), random_ints(data, nodes))
+    nx.set_edge_attributes(tree, {e: {RATE: r, DATA: d} for e, (r, d) in zip(tree.edges, edge_attrs)})
     tree = nx.relabel_nodes(tree, {0: PLATFORM})
     tree.graph[NAME] = f"random_tree_{time.time()}"
     return tree
@@ -11,15 +11,24 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import functools
 import itertools
 
 import networkx as nx
 from matplotlib import pyplot as plt
 
-from alg.util import path_blocks
 from service.common import *
 
 
+@functools.lru_cache(maxsize=32)
+def tree_layout(nodes: tuple, edges: tuple) -> dict:
+    """Calculate top-down layout of a tree structure with graphviz dot, cached for the recent drawings of the tree"""
+    tree = nx.DiGraph()
+    tree.add_nodes_from(nodes)
+    tree.add_edges_from(edges)
+    return nx.drawing.nx_agraph.graphviz_layout(tree, prog='dot', root=0)
+
+
 def draw_tree(sg: nx.DiGraph, partition: list = None, draw_weights=False, draw_blocks=False, figsize=None, ax=None,
               **kwargs):
     """Draw tree and given partitioning in a top-down topological structure"""
@@ -29,25 +38,23 @@ def draw_tree(sg: nx.DiGraph, partition: list = None, draw_weights=False, draw_b
     if ax is None:
         plt.figure(figsize=figsize, dpi=300)
         ax = plt.gca()
-    colors = itertools.cycle(('red', 'orange', "brown", 'green', "purple", "blue", "black", "magenta"))
-    for v in sg.nodes:
-        if COLOR in sg.nodes[v]:
-            del sg.nodes[v][COLOR]
-    sg.nodes[PLATFORM][COLOR] = "gray"
+    palette = itertools.cycle(('red', 'orange', "brown", 'green', "purple", "blue", "black", "magenta"))
+    # Node colors are collected separately to leave the node attributes of the graph untouched
+    colors = {PLATFORM: "gray"}
     if partition:
+        # Index of the block of each node
+        node_blk = {v: i for i, blk in enumerate(partition) for v in blk}
         for node, pred in nx.bfs_predecessors(sg, PLATFORM):
-            if COLOR in sg.nodes[node]:
+            if node in colors:
                 continue
-            blk = 0
-            while node not in partition[blk]:
-                blk += 1
-            color = next(colors)
-            if COLOR in sg.nodes[pred]:
-                while sg.nodes[pred][COLOR] == color:
-                    color = next(colors)
+            blk = node_blk[node]
+            color = next(palette)
+            if pred in colors:
+                while colors[pred] == color:
+                    color = next(palette)
             for n in partition[blk]:
-                sg.nodes[n][COLOR] = color
-        node_colors = [sg.nodes[n][COLOR] for n in sg.nodes]
+                colors[n] = color
+        node_colors = [colors[n] for n in sg.nodes]
     else:
         node_colors = ["tab:gray" if n == PLATFORM else "tab:green" for n in sg.nodes]
     if draw_weights:
@@ -55,7 +62,8 @@ def draw_tree(sg: nx.DiGraph, partition: list = None, draw_weights=False, draw_b
     else:
         labels = {n: n for n in sg.nodes}
     labels[PLATFORM] = PLATFORM
-    pos = nx.drawing.nx_agraph.graphviz_layout(sg, prog='dot', root=0)
+    # Layout depends only on the structure -> node attributes (e.g., labels) do not alter the positions
+    pos = tree_layout(tuple(sg.nodes), tuple(sg.edges))
     nx.draw(sg, ax=ax, pos=pos, arrows=True, arrowsize=20, width=2, with_labels=True, node_size=1000, font_size=10,
             font_color="white", labels=labels, node_color=node_colors, **kwargs)
     if draw_weights:
@@ -68,17 +76,19 @@ def draw_tree(sg: nx.DiGraph, partition: list = None, draw_weights=False, draw_b
                        if len(dist_x) > 1 else pos[PLATFORM][0])
         off_y = 0.5 * (sum(abs(b - a) for a, b in itertools.pairwise(dist_y)) // len(dist_y)
                        if len(dist_y) > 1 else pos[PLATFORM][1])
+        # Topological level of the nodes to split the blocks into levels
+        level = {v: i for i, gen in enumerate(nx.topological_generations(sg)) for v in gen}
         for blk in partition:
             lefts, rights = [(pos[blk[0]][0] - off_x, pos[blk[0]][1] + off_y)], \
                             [(pos[blk[0]][0] + off_x, pos[blk[0]][1] + off_y)]
-            levels = path_blocks(list(nx.topological_generations(sg)), blk)
+            levels = [list(lvl) for _, lvl in itertools.groupby(blk, key=level.get)]
             for i, lvl in enumerate(levels):
                 lefts.append((pos[min(lvl)][0] - off_x, pos[min(lvl)][1]))
                 rights.append((pos[max(lvl)][0] + off_x, pos[max(lvl)][1]))
             lefts.append((pos[min(levels[-1])][0] - off_x, pos[min(levels[-1])][1] - off_y))
             rights.append((pos[max(levels[-1])][0] + off_x, pos[max(levels[-1])][1] - off_y))
             rights.reverse()
-            poly = plt.Polygon(lefts + rights, closed=True, fc=sg.nodes[blk[0]][COLOR], ec=sg.nodes[blk[0]][COLOR],
+            poly = plt.Polygon(lefts + rights, closed=True, fc=colors[blk[0]], ec=colors[blk[0]],
                                lw=3, ls=':', fill=True, alpha=0.3, capstyle='round', zorder=0)
             ax.add_patch(poly)
     plt.title(sg.graph[NAME])
@@ -11,13 +11,21 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import contextlib
+import io
 import itertools
 import math
+import multiprocessing
+import os
+import random
+import time
 
 import networkx as nx
+import numpy as np
 import tabulate
 
 from alg.util import block_memory, block_latency, path_blocks, block_cost, block_cpu, label_nodes, ichain
+from misc import generator
 from misc.plot import draw_tree
 from service.common import *
 
@@ -34,8 +42,9 @@ def print_tree_summary(sg: nx.DiGraph):
 def get_chain_k_min(memory: list[int], M: int, rate: list[int], N: int, start: int = 0, end: int = None) -> int:
     """Return minimal number of blocks due to constraint M and N"""
     end = end if end is not None else len(memory) - 1
-    return max(math.ceil(block_memory(memory, start, end) / M),
-               sum(1 for i, j in itertools.pairwise(rate[start: end + 1]) if math.ceil(j / i) > N))
+    r = np.asarray(rate[start: end + 1])
+    # Count edges requiring more CPU cores than N with integer ceil -> ceil(j / i) = -(-j // i)
+    return max(math.ceil(block_memory(memory, start, end) / M), int(np.count_nonzero(-(-r[1:] // r[:-1]) > N)))
 
 
 def get_chain_c_max(runtime: list[int], L: int, b: int, w: int, delay: int, start: int = 0, end: int = None) -> int:
@@ -78,24 +87,26 @@ def print_chain_summary(runtime: list[int], memory: list[int], rate: list[int]):
     print("Chain:", "[", *(f"-{r}-> F({t}|M{m})" for t, m, r in zip(runtime, memory, rate)), "]")
 
 
-def print_cpath_stat(sg: nx.DiGraph, partition: list[list[int]], cpath: list[int] = None, delay: int = 10):
+def print_cpath_stat(sg: nx.DiGraph, partition: list[list[int]], cpath: list[int] = None, delay: int = 10,
+                     c_blocks: list[list[int]] = None):
     """Print the related block of the critical path and """
     if len(partition) > 0:
-        c_blocks = path_blocks(partition, cpath)
+        # Blocks of the critical path depend only on the structure -> reuse them if given
+        c_blocks = c_blocks if c_blocks is not None else path_blocks(partition, cpath)
         opt_cut = len(c_blocks) - 1
         sum_lat = sum(block_latency([sg.nodes[v][RUNTIME] for v in blk], 0, len(blk) - 1, delay, 0, len(blk) - 1)
                       for blk in c_blocks) + opt_cut * delay
-        print("Critical blocks of cpath", [cpath[0], cpath[-1]], "=>", c_blocks, "-", "opt_cut:", opt_cut, "-",
-              "opt_lat:", sum_lat)
+        print("Critical blocks of cpath", [c_blocks[0][0], c_blocks[-1][-1]], "=>", c_blocks, "-", "opt_cut:", opt_cut,
+              "-", "opt_lat:", sum_lat)
 
 
 def print_tree_block_stat(sg: nx.DiGraph, partition: list[list[int]], unit: int = 100):
     """Print cost memory and latency values of partition blocks in tabulated format"""
+    # Rate of the ingoing edge of each node for fast lookups
+    sg_rate = {v: r for _, v, r in sg.edges.data(RATE)}
     stat = []
     for blk in partition:
-        pred = next(sg.predecessors(blk[0]))
-        runtime, memory, rate = zip(*[(sg.nodes[v][RUNTIME], sg.nodes[v][MEMORY], sg[u][v][RATE])
-                                      for u, v in itertools.pairwise([pred] + blk)])
+        runtime, memory, rate = zip(*[(sg.nodes[v][RUNTIME], sg.nodes[v][MEMORY], sg_rate[v]) for v in blk])
         b, w = 0, len(blk) - 1
         stat.append([str([blk[b], blk[w]]),
                      block_cost(runtime, rate, b, w, unit),
@@ -106,15 +117,60 @@ def print_tree_block_stat(sg: nx.DiGraph, partition: list[list[int]], unit: int
 
 
 def evaluate_tree_partitioning(tree: nx.DiGraph, partition: list[list[int]], opt_cost: int, root: int, cp_end: int,
-                               M: int, N: int, L: int, delay: int, unit: int):
+                               M: int, N: int, L: int, delay: int, unit: int, draw: bool = True,
+                               c_blocks: list[list[int]] = None):
     tree = label_nodes(tree)
     print(tree.graph.get(NAME, "tree").center(80, '#'))
-    print("Runtime:", [tree.nodes[v][RUNTIME] for v in tree.nodes if v != PLATFORM])
-    print("Memory:", [tree.nodes[v][MEMORY] for v in tree.nodes if v != PLATFORM])
-    print("Rate:", [tree[next(tree.predecessors(v))][v][RATE] for v in tree.nodes if v != PLATFORM])
+    # Collect node attributes and the rate of the ingoing edges in one pass
+    tree_rate = {v: r for _, v, r in tree.edges.data(RATE)}
+    runtime, memory, rate = [], [], []
+    for v, nd in tree.nodes(data=True):
+        if v != PLATFORM:
+            runtime.append(nd[RUNTIME])
+            memory.append(nd[MEMORY])
+            rate.append(tree_rate[v])
+    print("Runtime:", runtime)
+    print("Memory:", memory)
+    print("Rate:", rate)
     print(f"Tree partitioning [M={M}, N={N}, L={L}:{(root, cp_end)}] => {partition} - opt_cost: {opt_cost}")
     if partition:
-        print_cpath_stat(tree, partition, list(ichain(tree, root, cp_end)), delay)
+        # The critical path is only needed to calculate its blocks if they are not given
+        cpath = list(ichain(tree, root, cp_end)) if c_blocks is None else None
+        print_cpath_stat(tree, partition, cpath, delay, c_blocks)
         print_tree_block_stat(tree, partition, unit)
-        draw_tree(tree, partition, draw_blocks=True, draw_weights=False)
+        if draw:
+            draw_tree(tree, partition, draw_blocks=True, draw_weights=False)
     print('#' * 80)
+
+
+def timed_run(alg, params: dict) -> tuple:
+    """Run the given algorithm and return its result, CPU time in ns, and printed log"""
+    with contextlib.redirect_stdout(io.StringIO()) as log:
+        t_start = time.process_time_ns()
+        result = alg(**params)
+        alg_time = time.process_time_ns() - t_start
+    return result, alg_time, log.getvalue()
+
+
+def seeded_validation(validation, n: int, seed: int, cache_failed: bool) -> tuple[str, list, str]:
+    """Run one *validation* of size *n* seeded with *seed* and return its result, statistics, and printed log"""
+    random.seed(seed)
+    generator.seed_rng(seed)
+    with contextlib.redirect_stdout(io.StringIO()) as log:
+        result, stat = validation(n, cache_failed=cache_failed, stop_failed=False, parallel=False, verbose=False)
+    return result, stat, log.getvalue()
+
+
+def stress_validations(validation, n: int, iteration: int, cache_failed: bool) -> tuple[tuple, tuple]:
+    """Run seeded *validation* of size *n* *iteration* times and return the results and statistics of the runs"""
+    # Iterations are independent -> run them in parallel with separate seeds drawn here for reproducibility
+    seeds = [random.getrandbits(32) for _ in range(iteration)]
+    with multiprocessing.Pool(os.cpu_count()) as pool:
+        results = pool.starmap(seeded_validation, zip(itertools.repeat(validation), itertools.repeat(n), seeds,
+                                                      itertools.repeat(cache_failed)))
+    valid, stats, logs = zip(*results)
+    # Print only the logs of failed validations
+    for result, log in zip(valid, logs):
+        if result != 'SUCCESS':
+            print(log, end='')
+    return valid, stats
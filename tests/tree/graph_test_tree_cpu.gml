@@ -0,0 +1,118 @@
+graph [
+  directed 1
+  name "graph_test_tree_cpu"
+  node [
+    id 0
+    label "P"
+  ]
+  node [
+    id 1
+    label "1"
+    time 40
+    mem 3
+  ]
+  node [
+    id 2
+    label "2"
+    time 62
+    mem 1
+  ]
+  node [
+    id 3
+    label "3"
+    time 30
+    mem 3
+  ]
+  node [
+    id 4
+    label "4"
+    time 68
+    mem 2
+  ]
+  node [
+    id 5
+    label "5"
+    time 97
+    mem 3
+  ]
+  node [
+    id 6
+    label "6"
+    time 57
+    mem 3
+  ]
+  node [
+    id 7
+    label "7"
+    time 69
+    mem 3
+  ]
+  node [
+    id 8
+    label "8"
+    time 78
+    mem 2
+  ]
+  node [
+    id 9
+    label "9"
+    time 94
+    mem 1
+  ]
+  node [
+    id 10
+    label "10"
+    time 5
+    mem 1
+  ]
+  edge [
+    source 0
+    target 1
+    rate 2
+  ]
+  edge [
+    source 1
+    target 2
+    rate 2
+  ]
+  edge [
+    source 2
+    target 3
+    rate 3
+  ]
+  edge [
+    source 2
+    target 4
+    rate 1
+  ]
+  edge [
+    source 3
+    target 5
+    rate 3
+  ]
+  edge [
+    source 3
+    target 6
+    rate 1
+  ]
+  edge [
+    source 4
+    target 7
+    rate 3
+  ]
+  edge [
+    source 6
+    target 8
+    rate 2
+  ]
+  edge [
+    source 8
+    target 9
+    rate 2
+  ]
+  edge [
+    source 9
+    target 10
+    rate 3
+  ]
+]
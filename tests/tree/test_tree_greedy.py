@@ -28,7 +28,8 @@ def run_test(tree: nx.DiGraph, M: int, N: int, L: int, root: int = 1, cp_end: in
     results = greedy_tree_partitioning(tree, root, M, N, L, cp_end, delay, unit)
     for i, (part, best_cost, best_lat) in enumerate(results):
         print(f"  GREEDY[{i}]  ".center(80, '#'))
-        evaluate_tree_partitioning(tree, part, best_cost, root, cp_end, M, N, L, delay, unit)
+        # Draw only the first one of the equal-cost partitionings
+        evaluate_tree_partitioning(tree, part, best_cost, root, cp_end, M, N, L, delay, unit, draw=i == 0)
     return results
 
 
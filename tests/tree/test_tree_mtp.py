@@ -16,6 +16,7 @@ import math
 import networkx as nx
 
 from alg.tree_meta_MTP import label_nodes, isubchains, mtp_tree_partitioning
+from alg.tree_rec_BTP import btp_tree_partitioning
 from alg.util import ichain
 from misc.generator import get_random_tree
 from misc.plot import draw_tree
@@ -99,6 +100,21 @@ def test_tree_partitioning_latency():
     run_test(**locals())
 
 
+def test_tree_partitioning_cpu():
+    tree = nx.read_gml("graph_test_tree_cpu.gml", destringizer=int)
+    tree.graph[NAME] += "-meta_partition"
+    M = math.inf
+    N = 1
+    L = math.inf
+    root = 1
+    cp_end = 5
+    delay = 10
+    # Cuts required by N on the whole subchain need a looser latency limit on the cpath head than its own cuts
+    _, opt_cost, _ = run_test(**locals())
+    _, btp_cost, _ = btp_tree_partitioning(tree, root, M, N, L, cp_end, delay)
+    assert opt_cost == btp_cost == 2000
+
+
 if __name__ == '__main__':
     # test_node_labeling()
     # test_chain_pruning()
@@ -106,3 +122,4 @@ if __name__ == '__main__':
     test_tree_partitioning()
     test_random_tree_partitioning()
     test_tree_partitioning_latency()
+    test_tree_partitioning_cpu()
@@ -11,34 +11,41 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-import collections
+import concurrent.futures
 import itertools
 import json
 import math
 import random
 import time
 
+import numpy as np
 import pandas as pd
 import tabulate
 
-from misc.util import print_chain_summary
+from misc.generator import random_ints
+from misc.util import print_chain_summary, timed_run, stress_validations
 from chain.test_chain_dp_scp import run_test as dp_chain_test
 from chain.test_chain_greedy import run_test as greedy_chain_test
 from chain.test_chain_vec_scp import run_test as vec_chain_test
 
 
-def run_all_tests(params: dict):
+def run_all_tests(params: dict, parallel: bool = True):
     chain_algs = dict(
         GREEDY=greedy_chain_test,
         SCP=dp_chain_test,
         VEC_SCP=vec_chain_test
     )
     ##########################################################
+    # Algorithms are independent -> run them in separate processes
+    if parallel:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=len(chain_algs)) as executor:
+            results = list(executor.map(timed_run, chain_algs.values(), itertools.repeat(params)))
+    else:
+        results = [timed_run(chain_alg, params) for chain_alg in chain_algs.values()]
     stats = []
-    for name, chain_alg in chain_algs.items():
-        t_start = time.process_time()
-        result = chain_alg(**params)
-        alg_time = time.process_time() - t_start
+    for name, (result, alg_time, log) in zip(chain_algs, results):
+        # Print the logs of the algorithms in order
+        print(log, end='')
         if name == 'GREEDY':
             stats.extend([[name + f'_{i}', *res, alg_time] for i, res in enumerate(result)])
         else:
@@ -65,7 +72,7 @@ def compare_results(chain_path: str = None):
     # params['L'] = math.inf
     stats = run_all_tests(params)
     print("Summary:")
-    print(tabulate.tabulate(stats, ['Alg.', 'Partition', 'Cost', 'Lat/Cut', 'Time'],
+    print(tabulate.tabulate(stats, ['Alg.', 'Partition', 'Cost', 'Lat/Cut', 'Time(ns)'],
                             numalign='center', stralign='left', tablefmt='pretty'))
 
 
@@ -80,23 +87,24 @@ def test_latencies():
                   start=1,
                   end=8,
                   unit=100)
+    # Latency of the limited subchain without cuts
+    lat_min = sum(runtime[params['start']:params['end'] + 1])
     lats = [math.inf,
             # No restriction
-            sum(runtime[params['start']:params['end'] + 1]) + params['delay'] * 4,
+            lat_min + params['delay'] * 4,
             # Optimal
-            sum(runtime[params['start']:params['end'] + 1]) + params['delay'] * 3,
+            lat_min + params['delay'] * 3,
             # Forces to reduce blocks
-            sum(runtime[params['start']:params['end'] + 1]) + params['delay'] * 2,
+            lat_min + params['delay'] * 2,
             # Infeasible due to M
-            sum(runtime[params['start']:params['end'] + 1]) + params['delay'] * 1]
+            lat_min + params['delay'] * 1]
     print_chain_summary(params['runtime'], params['memory'], params['rate'])
     for lat in lats:
         params['L'] = lat
-        print_chain_summary(params['runtime'], params['memory'], params['rate'])
         stat = run_all_tests(params)
         print("  Statistics  ".center(80, '#'))
         print("Params:", repr(params))
-        print(tabulate.tabulate(stat, ['Alg.', 'Partition', 'Cost', 'Lat/Cut', 'Time'],
+        print(tabulate.tabulate(stat, ['Alg.', 'Partition', 'Cost', 'Lat/Cut', 'Time(ns)'],
                                 numalign='center', stralign='left', tablefmt='pretty'))
         greedy_parts, dp_part, vec_part = [p[1] for p in stat[:-2]], stat[-2][1], stat[-1][1]
         validated = bool(dp_part in greedy_parts and vec_part in greedy_parts)
@@ -105,12 +113,13 @@ def test_latencies():
         print('#' * 80)
 
 
-def test_random_validation(n: int = 10, cache_failed: bool = True, stop_failed: bool = False):
-    runtime = [random.randint(10, 100) for _ in range(n)]
+def test_random_validation(n: int = 10, cache_failed: bool = True, stop_failed: bool = False,
+                           parallel: bool = True, verbose: bool = True):
+    runtime = random_ints((10, 100), n)
     delay = 10
     params = dict(runtime=runtime,
-                  memory=[random.randint(1, 3) for _ in range(n)],
-                  rate=[1, *(random.randint(1, 3) for _ in range(n-1))],
+                  memory=random_ints((1, 3), n),
+                  rate=[1, *random_ints((1, 3), n - 1)],
                   delay=delay,
                   M=6,
                   N=2,
@@ -119,15 +128,17 @@ def test_random_validation(n: int = 10, cache_failed: bool = True, stop_failed:
                   end=len(runtime) - 1,
                   unit=100)
     print_chain_summary(params['runtime'], params['memory'], params['rate'])
-    stat = run_all_tests(params)
-    print("  Statistics  ".center(80, '#'))
-    print("Params:", repr(params))
-    print(tabulate.tabulate(stat, ['Alg.', 'Partition', 'Cost', 'Lat/Cut', 'Time'],
-                            numalign='center', stralign='left', tablefmt='pretty'))
+    stat = run_all_tests(params, parallel)
     greedy_parts, dp_part, vec_part = [p[1] for p in stat[:-2]], stat[-2][1], stat[-1][1]
     greedy_cost, dp_cost, vec_cost = stat[0][2], stat[-2][2], stat[-1][2]
     validated = (dp_part in greedy_parts and vec_part in greedy_parts) and (
         greedy_cost == dp_cost == vec_cost if dp_cost and vec_cost and greedy_cost else True)
+    # Statistics table is formatted only if requested or the validation fails
+    if verbose or not validated:
+        print("  Statistics  ".center(80, '#'))
+        print("Params:", repr(params))
+        print(tabulate.tabulate(stat, ['Alg.', 'Partition', 'Cost', 'Lat/Cut', 'Time(ns)'],
+                                numalign='center', stralign='left', tablefmt='pretty'))
     if not validated and cache_failed:
         with open(f"failed_chain_{time.time()}.json", 'w') as f:
             json.dump(params, f, indent=4)
@@ -140,13 +151,19 @@ def test_random_validation(n: int = 10, cache_failed: bool = True, stop_failed:
 
 
 def stress_test(n: int = 10, iteration: int = 100):
-    results = [test_random_validation(n, cache_failed=False, stop_failed=False) for _ in range(iteration)]
-    valid, stats = zip(*results)
-    print("Validation statistics:", collections.Counter(valid))
-    df = pd.DataFrame(itertools.chain(*stats))
+    valid, stats = stress_validations(test_random_validation, n, iteration, cache_failed=False)
+    labels, counts = np.unique(np.asarray(valid), return_counts=True)
+    print("Validation statistics:", dict(zip(labels.tolist(), counts.tolist())))
+    df = pd.DataFrame.from_records(list(itertools.chain.from_iterable(stats)),
+                                   columns=['alg', 'part', 'cost', 'lat', 'time'])
+    # Numeric columns with missing values as NaN and algorithm names as category codes
+    df = df.astype({'alg': 'category', 'cost': 'float64', 'lat': 'float64', 'time': 'int64'})
+    # Infeasible partitionings have infinite cost -> mark them as missing to be dropped with the missing ones
+    df['cost'] = df['cost'].replace(math.inf, np.nan)
     pd.set_option('display.expand_frame_repr', False)
-    print("Runtime statistics:")
-    print(df[(df[2] < math.inf) & (df[0].isin(('GREEDY_0', 'SCP', 'VEC_SCP')))][[0, 4]].groupby(0).describe())
+    print("Runtime statistics (ns):")
+    df = df.dropna(subset=['cost'])
+    print(df[df['alg'].isin(('GREEDY_0', 'SCP', 'VEC_SCP'))][['alg', 'time']].groupby('alg', observed=True).describe())
 
 
 if __name__ == '__main__':
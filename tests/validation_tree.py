@@ -11,13 +11,13 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-import collections
+import concurrent.futures
 import itertools
 import math
 import random
-import time
 
 import networkx as nx
+import numpy as np
 import pandas as pd
 import tabulate
 
@@ -26,21 +26,27 @@ from alg.tree_meta_MTP import mtp_tree_partitioning
 from alg.tree_rec_BTP import btp_tree_partitioning
 from alg.util import ibacktrack_chain
 from misc.generator import get_random_tree
+from misc.util import timed_run, stress_validations
 from service.common import *
 
 
-def run_all_tests(params: dict):
+def run_all_tests(params: dict, parallel: bool = True):
     tree_algs = dict(
         GREEDY=greedy_tree_partitioning,
         MTP=mtp_tree_partitioning,
         BTP=btp_tree_partitioning
     )
     ##########################################################
+    # Algorithms are independent -> run them in separate processes
+    if parallel:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=len(tree_algs)) as executor:
+            results = list(executor.map(timed_run, tree_algs.values(), itertools.repeat(params)))
+    else:
+        results = [timed_run(tree_alg, params) for tree_alg in tree_algs.values()]
     stats = []
-    for name, tree_alg in tree_algs.items():
-        t_start = time.process_time()
-        result = tree_alg(**params)
-        alg_time = time.process_time() - t_start
+    for name, (result, alg_time, log) in zip(tree_algs, results):
+        # Print the logs of the algorithms in order
+        print(log, end='')
         if name == 'GREEDY':
             stats.extend([[name + f'_{i}', *res, alg_time] for i, res in enumerate(result)])
         else:
@@ -54,7 +60,7 @@ def compare_results(tree_path: str = None):
     ##########################################################
     stats = run_all_tests(params)
     print("Summary:")
-    print(tabulate.tabulate(stats, ['Alg.', 'Partition', 'Cost', 'Lat/Cut', 'Time'],
+    print(tabulate.tabulate(stats, ['Alg.', 'Partition', 'Cost', 'Lat/Cut', 'Time(ns)'],
                             numalign='center', stralign='left', tablefmt='pretty'))
 
 
@@ -67,31 +73,35 @@ def test_latencies():
     cp_end = 10
     delay = 10
     params = locals()
+    # Latency of the critical path without cuts
+    lat_min = sum(sg.nodes[v][RUNTIME] for v in (1, 3, 8, 10))
     lats = [math.inf,
             # Optimal solution
-            sum(sg.nodes[v][RUNTIME] for v in (1, 3, 8, 10)) + delay * 3,
+            lat_min + delay * 3,
             # Forces to reduce blocks
-            sum(sg.nodes[v][RUNTIME] for v in (1, 3, 8, 10)) + delay * 2,
+            lat_min + delay * 2,
             # Stricter latency
-            sum(sg.nodes[v][RUNTIME] for v in (1, 3, 8, 10)) + delay * 1,
+            lat_min + delay * 1,
             # Strictest latency
-            sum(sg.nodes[v][RUNTIME] for v in (1, 3, 8, 10)) + delay * 0,
+            lat_min + delay * 0,
             # Infeasible latency
-            sum(sg.nodes[v][RUNTIME] for v in (1, 3, 8, 10)) - 1]
+            lat_min - 1]
     print(sg.graph.get(NAME, "tree").center(80, '#'))
     print("Runtime:", [sg.nodes[v][RUNTIME] for v in sg.nodes if v != PLATFORM])
     print("Memory:", [sg.nodes[v][MEMORY] for v in sg.nodes if v != PLATFORM])
-    print("Rate:", [sg[next(sg.predecessors(v))][v][RATE] for v in sg.nodes if v != PLATFORM])
+    sg_rate = {v: r for _, v, r in sg.edges.data(RATE)}
+    print("Rate:", [sg_rate[v] for v in sg.nodes if v != PLATFORM])
     for lat in lats:
         params['L'] = lat
         stat = run_all_tests(params)
         print("Params:", repr(params))
-        print(tabulate.tabulate(stat, ['Alg.', 'Partition', 'Cost', 'Lat/Cut', 'Time'],
+        print(tabulate.tabulate(stat, ['Alg.', 'Partition', 'Cost', 'Lat/Cut', 'Time(ns)'],
                                 numalign='center', stralign='left', tablefmt='pretty'))
         print('#' * 80)
 
 
-def test_random_validation(n: int = 10, cache_failed: bool = False, stop_failed=False):
+def test_random_validation(n: int = 10, cache_failed: bool = False, stop_failed=False, parallel: bool = True,
+                           verbose: bool = True):
     sg = get_random_tree(n)
     cp_end = n
     cpath = list(reversed(list(ibacktrack_chain(sg, 1, cp_end))))
@@ -101,17 +111,20 @@ def test_random_validation(n: int = 10, cache_failed: bool = False, stop_failed=
     print(sg.graph.get(NAME, "tree").center(80, '#'))
     print("Runtime:", [sg.nodes[v][RUNTIME] for v in sg.nodes if v != PLATFORM])
     print("Memory:", [sg.nodes[v][MEMORY] for v in sg.nodes if v != PLATFORM])
-    print("Rate:", [sg[next(sg.predecessors(v))][v][RATE] for v in sg.nodes if v != PLATFORM])
+    sg_rate = {v: r for _, v, r in sg.edges.data(RATE)}
+    print("Rate:", [sg_rate[v] for v in sg.nodes if v != PLATFORM])
     print(f"Tree partitioning [M={params['M']}, L={params['L']}:{(1, cp_end)}] -> cpath:{cpath}, min_lat:{l_min}")
-    stat = run_all_tests(params)
-    print("Params:", repr(params))
-    print(tabulate.tabulate(stat, ['Alg.', 'Partition', 'Cost', 'Lat/Cut', 'Time'],
-                            numalign='center', stralign='right', tablefmt='pretty'))
-    print('#' * 80)
+    stat = run_all_tests(params, parallel)
     greedy_parts, meta_part, seq_part = [p[1] for p in stat[:-2]], stat[-2][1], stat[-1][1]
     greedy_cost, meta_cost, seq_cost = stat[0][2], stat[-2][2], stat[-1][2]
     validated = (meta_part in greedy_parts and seq_part in greedy_parts) and (
         meta_cost == seq_cost == greedy_cost if meta_cost and seq_cost and greedy_cost else True)
+    # Statistics table is formatted only if requested or the validation fails
+    if verbose or not validated:
+        print("Params:", repr(params))
+        print(tabulate.tabulate(stat, ['Alg.', 'Partition', 'Cost', 'Lat/Cut', 'Time(ns)'],
+                                numalign='center', stralign='right', tablefmt='pretty'))
+        print('#' * 80)
     if not validated and cache_failed:
         sg.graph[NAME] = f"failed_tree_{sg.graph[NAME]}.gml"
         nx.write_gml(sg, sg.graph[NAME])
@@ -124,12 +137,18 @@ def test_random_validation(n: int = 10, cache_failed: bool = False, stop_failed=
 
 
 def stress_test(n: int = 10, iteration: int = 100):
-    results = [test_random_validation(n, cache_failed=True, stop_failed=False) for _ in range(iteration)]
-    valid, stats = zip(*results)
-    print("Validation statistics:", collections.Counter(valid))
-    df = pd.DataFrame(itertools.chain(*stats))
+    valid, stats = stress_validations(test_random_validation, n, iteration, cache_failed=True)
+    labels, counts = np.unique(np.asarray(valid), return_counts=True)
+    print("Validation statistics:", dict(zip(labels.tolist(), counts.tolist())))
+    df = pd.DataFrame.from_records(list(itertools.chain.from_iterable(stats)),
+                                   columns=['alg', 'part', 'cost', 'lat', 'time'])
+    # Numeric columns with missing values as NaN and algorithm names as category codes
+    df = df.astype({'alg': 'category', 'cost': 'float64', 'lat': 'float64', 'time': 'int64'})
+    # Infeasible partitionings have infinite cost -> mark them as missing to be dropped with the missing ones
+    df['cost'] = df['cost'].replace(math.inf, np.nan)
     pd.set_option('display.expand_frame_repr', False)
-    print(df[(df[2] < math.inf) & (df[0].isin(('GREEDY_0', 'MTP', 'BTP')))][[0, 4]].groupby(0).describe())
+    df = df.dropna(subset=['cost'])
+    print(df[df['alg'].isin(('GREEDY_0', 'MTP', 'BTP'))][['alg', 'time']].groupby('alg', observed=True).describe())
 
 
 if __name__ == '__main__':
@@ -13,6 +13,7 @@
 # limitations under the License.
 from alg.tree_meta_MTP import mtp_tree_partitioning
 from alg.tree_rec_BTP import btp_tree_partitioning
+from alg.util import ichain, path_blocks, label_nodes
 from use_case.services import generate_daytime_service, generate_nighttime_service
 from misc.util import evaluate_tree_partitioning
 
@@ -48,15 +49,18 @@ def test_all_setups():
     night_service = generate_nighttime_service()
     day_part, day_cost, day_lat = btp_tree_partitioning(day_service, **params)
     night_part, night_cost, night_lat = btp_tree_partitioning(night_service, **params)
+    # Services share the same structure -> critical path blocks of each partitioning are calculated once
+    cpath = list(ichain(label_nodes(day_service), params['root'], params['cp_end']))
+    day_blocks, night_blocks = path_blocks(day_part, cpath), path_blocks(night_part, cpath)
 
     print("Daytime service - Daytime partitioning")
-    evaluate_tree_partitioning(day_service, day_part, day_cost, **params)
+    evaluate_tree_partitioning(day_service, day_part, day_cost, **params, c_blocks=day_blocks)
     print("Daytime service - Nighttime partitioning")
-    evaluate_tree_partitioning(day_service, night_part, None, **params)
+    evaluate_tree_partitioning(day_service, night_part, None, **params, c_blocks=night_blocks)
     print("Nighttime service - Nighttime partitioning")
-    evaluate_tree_partitioning(night_service, night_part, night_cost, **params)
+    evaluate_tree_partitioning(night_service, night_part, night_cost, **params, c_blocks=night_blocks)
     print("Nighttime service - Daytime partitioning")
-    evaluate_tree_partitioning(night_service, day_part, None, **params)
+    evaluate_tree_partitioning(night_service, day_part, None, **params, c_blocks=day_blocks)
 
 
 if __name__ == '__main__':